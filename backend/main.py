@@ -8,17 +8,45 @@ import os
 # shared 모듈 경로 추가
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
 from typing import Optional, List
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from shared.constants import COLLECTION_LOTTO_HISTORY
-from shared.lotto_api import get_lotto_win_numbers, get_latest_draw_number
-from shared.analysis import analyze_number_frequency, get_recommended_numbers
+from shared.constants import COLLECTION_LOTTO_HISTORY, MAX_HISTORY_PAGE_SIZE
+from shared.lotto_api import fetch_draw_range, get_latest_draw_number
+from shared.backfill import consecutive_prefix, write_draws
+from shared.analysis import GapIndex, TransitionIndex
+from shared.strategies import AnalysisContext, StrategyPools, available_strategies, get_strategy
+from shared.draw_statistics import get_draw_statistics
+from shared.snapshot import AnalysisSnapshot
+from shared.simulation import parse_simulation_request, simulate_portfolio
+from shared.wheeling import MAX_BUDGET, generate_portfolio
+from shared.ticket_index import TicketHistoryIndex, parse_ticket, validate_ticket
 from shared.weekly_stats import WeeklyStatsManager
+from shared.serialization import (
+    COLUMNAR_FORMAT,
+    NDJSON_MEDIA_TYPE,
+    encode_response,
+    frame_to_records,
+    frequency_frame,
+    iter_ndjson,
+    to_columnar,
+)
+from shared.profiling import (
+    ADMIN_TOKEN_HEADER,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_QUERY_PARAM,
+    RequestProfiler,
+    profiled,
+    profiled_stream,
+)
+from shared.storage import FirestoreStatsStorage, SQLiteStatsStorage, WeeklyStatsStorage
 from shared.firebase_client import initialize_firebase
 
 # 환경변수 로드
@@ -27,40 +55,162 @@ load_dotenv()
 # Firebase 초기화
 db = initialize_firebase(use_env=True)
 
+# 로컬 모드 주간 통계 저장 경로
+LOCAL_STATS_DB = os.getenv(
+    "WEEKLY_STATS_DB", os.path.join(os.path.dirname(__file__), "weekly_stats.db")
+)
+LOCAL_STATS_JSON = os.path.join(os.path.dirname(__file__), "weekly_stats.json")
+
+
+def create_stats_storage() -> WeeklyStatsStorage:
+    """Firebase가 없으면 로컬 SQLite 저장소를 사용합니다."""
+    if db:
+        return FirestoreStatsStorage(db)
+
+    storage = SQLiteStatsStorage(LOCAL_STATS_DB)
+    # 최초 실행 시 기존 weekly_stats.json 내용을 가져옵니다
+    if storage.load_current() is None:
+        storage.import_json(LOCAL_STATS_JSON)
+    return storage
+
+
 # 주간 통계 매니저
-stats_manager = WeeklyStatsManager(db)
+stats_manager = WeeklyStatsManager(db, storage=create_stats_storage())
 stats_manager.load()
 
 # 로또 데이터 DataFrame
 lotto_history_df = pd.DataFrame()
 
+# 번호별 미출현 간격 인덱스
+gap_index = GapIndex()
 
-def load_lotto_data() -> pd.DataFrame:
-    """Firebase 또는 CSV에서 로또 데이터를 로드합니다."""
+# 번호별 출현 회차 비트셋 역색인
+ticket_index = TicketHistoryIndex()
+
+# 연속 회차 간 번호 전이 인덱스
+transition_index = TransitionIndex()
+
+# 전략별 사전 계산된 후보 풀 (데이터 버전마다 갱신)
+strategy_pools = StrategyPools()
+
+# 게시된 분석 스냅샷이 현재 데이터/전략 버전과 같은지 (다르면 업데이트 파이프라인이 다시 게시)
+snapshot_current = False
+
+# 요청 프로파일러 (관리자 요청 + LOTTO_PROFILE_SAMPLE_RATE 비율 자동 수집)
+request_profiler = RequestProfiler()
+
+
+def refresh_strategy_pools() -> None:
+    """현재 데이터와 인덱스로 전략별 후보 풀을 다시 계산합니다."""
+    strategy_pools.refresh(
+        AnalysisContext(
+            lotto_history_df, gap_index=gap_index, transition_index=transition_index
+        )
+    )
+
+
+def refresh_analysis_state() -> None:
+    """로또 데이터 전체가 다시 로드되면 파생 인덱스를 재구성합니다."""
+    global gap_index, ticket_index, transition_index
+
+    gap_index = GapIndex.from_history(lotto_history_df)
+    ticket_index = TicketHistoryIndex.from_history(lotto_history_df)
+    transition_index = TransitionIndex.from_history(lotto_history_df)
+    refresh_strategy_pools()
+
+
+def append_draws(new_draws: list[dict]) -> None:
+    """새 회차를 DataFrame과 파생 인덱스에 증분 반영합니다."""
     global lotto_history_df
 
+    lotto_history_df = pd.concat(
+        [lotto_history_df, pd.DataFrame(new_draws)], ignore_index=True
+    )
+    for draw_data in new_draws:
+        gap_index.update(draw_data)
+        ticket_index.update(draw_data)
+        transition_index.update(draw_data)
+    refresh_strategy_pools()
+
+
+def fetch_saved_draws(after: int = 0) -> list[dict]:
+    """Firebase에 저장된 회차를 회차순으로 가져옵니다 (after 회차 이후만)."""
+    query = db.collection(COLLECTION_LOTTO_HISTORY).order_by("draw_no")
+    if after:
+        query = query.start_after({"draw_no": after})
+
+    firebase_data = []
+    for doc in query.get():
+        data = doc.to_dict()
+        firebase_data.append(
+            {
+                "draw_no": data["draw_no"],
+                "num1": data["num1"],
+                "num2": data["num2"],
+                "num3": data["num3"],
+                "num4": data["num4"],
+                "num5": data["num5"],
+                "num6": data["num6"],
+                "bonus": data["bonus"],
+            }
+        )
+    return firebase_data
+
+
+def apply_snapshot(snapshot: AnalysisSnapshot) -> None:
+    """게시된 분석 스냅샷으로 데이터와 파생 인덱스를 다시 계산 없이 복원합니다."""
+    global lotto_history_df, gap_index, ticket_index, transition_index, snapshot_current
+
+    lotto_history_df = snapshot.df
+    gap_index = snapshot.gap_index
+    transition_index = snapshot.transition_index
+    ticket_index = TicketHistoryIndex.from_history(lotto_history_df)
+    rebuilt = strategy_pools.restore(snapshot.context(), snapshot.pools)
+    if rebuilt:
+        print(f"전략 버전이 달라 후보 풀을 다시 계산: {', '.join(rebuilt)}")
+    snapshot_current = not rebuilt
+
+
+def publish_snapshot() -> None:
+    """
+    현재 분석 상태를 스냅샷 문서로 게시합니다.
+    업데이트 파이프라인에서만 호출합니다 (콜드 인스턴스는 읽기만 함).
+    """
+    global snapshot_current
+
+    if db and not lotto_history_df.empty:
+        snapshot_current = AnalysisSnapshot.capture(
+            lotto_history_df, gap_index, transition_index, strategy_pools
+        ).publish(db)
+
+
+def load_lotto_data() -> pd.DataFrame:
+    """분석 스냅샷, Firebase 또는 CSV에서 로또 데이터를 로드합니다."""
+    global lotto_history_df, snapshot_current
+
     try:
         if db:
-            collection_ref = db.collection(COLLECTION_LOTTO_HISTORY)
-            docs = collection_ref.order_by("draw_no").get()
-
-            if docs:
-                firebase_data = []
-                for doc in docs:
-                    data = doc.to_dict()
-                    firebase_data.append(
-                        {
-                            "draw_no": data["draw_no"],
-                            "num1": data["num1"],
-                            "num2": data["num2"],
-                            "num3": data["num3"],
-                            "num4": data["num4"],
-                            "num5": data["num5"],
-                            "num6": data["num6"],
-                            "bonus": data["bonus"],
-                        }
-                    )
+            snapshot = AnalysisSnapshot.load(db)
+            if snapshot is not None:
+                apply_snapshot(snapshot)
+                # 스냅샷 게시 이후 저장된 회차만 이어서 반영
+                newer_draws = fetch_saved_draws(after=snapshot.latest_draw)
+                if newer_draws:
+                    # 게시는 업데이트 파이프라인이 맡으므로 여기서는 반영만 합니다
+                    append_draws(newer_draws)
+                    snapshot_current = False
+                print(
+                    f"분석 스냅샷에서 로또 데이터 로드 완료: {len(lotto_history_df)}회차 "
+                    f"(스냅샷 {snapshot.version})"
+                )
+                return lotto_history_df
+
+            firebase_data = fetch_saved_draws()
+            if firebase_data:
                 lotto_history_df = pd.DataFrame(firebase_data)
+                refresh_analysis_state()
+                # 스냅샷이 없거나 스키마가 바뀐 경우 다음 업데이트 실행에서 게시
+                snapshot_current = False
                 print(f"Firebase에서 로또 데이터 로드 완료: {len(firebase_data)}회차")
                 return lotto_history_df
 
@@ -68,6 +218,7 @@ def load_lotto_data() -> pd.DataFrame:
         csv_path = os.path.join(os.path.dirname(__file__), "lotto_history.csv")
         if os.path.exists(csv_path):
             lotto_history_df = pd.read_csv(csv_path)
+            refresh_analysis_state()
             print(f"CSV에서 로또 데이터 로드 완료: {len(lotto_history_df)}회차")
 
     except Exception as e:
@@ -80,12 +231,20 @@ def load_lotto_data() -> pd.DataFrame:
 # 초기 데이터 로드
 load_lotto_data()
 
+class ProfiledRoute(APIRoute):
+    """엔드포인트를 실행하는 스레드를 요청 프로파일 세션에 등록하는 라우트"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="로또 번호 추천 API",
     description="AI 기반 로또 번호 분석 및 추천 시스템",
     version="2.0.0",
 )
+app.router.route_class = ProfiledRoute
 
 # CORS 설정
 app.add_middleware(
@@ -97,6 +256,20 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """관리자 요청 또는 샘플링된 요청의 콜스택을 수집합니다."""
+    forced = request_profiler.is_requested(
+        request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM),
+        request.headers.get(ADMIN_TOKEN_HEADER),
+    )
+    with request_profiler.profile(f"{request.method} {request.url.path}", forced) as session:
+        response = await call_next(request)
+    if session is not None and forced:
+        response.headers[PROFILE_ID_HEADER] = session.id
+    return response
+
+
 # Pydantic 모델
 class UserSelection(BaseModel):
     numbers: List[int]
@@ -104,6 +277,20 @@ class UserSelection(BaseModel):
     user_id: Optional[str] = None
 
 
+class SimulationRequest(BaseModel):
+    tickets: List[List[int]]
+    iterations: Optional[int] = None
+    time_budget: Optional[float] = None
+    tolerance: Optional[float] = None
+
+
+def json_response(request: Request, data) -> Response:
+    """Accept-Encoding에 맞춰 압축한 JSON 응답을 생성합니다."""
+    body, headers = encode_response(data, request.headers.get("accept-encoding"))
+    media_type = headers.pop("Content-Type")
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
 # API 엔드포인트
 @app.get("/")
 def read_root():
@@ -111,36 +298,124 @@ def read_root():
 
 
 @app.get("/api/history")
-def get_history():
-    """로또 역대 당첨 번호 조회"""
+def get_history(request: Request, format: Optional[str] = None):
+    """로또 역대 당첨 번호 조회 (format=columnar: 필드별 배열)"""
     if lotto_history_df.empty:
         load_lotto_data()
 
-    if not lotto_history_df.empty:
-        return lotto_history_df.to_dict(orient="records")
-    return {"error": "데이터를 불러올 수 없습니다"}
+    if lotto_history_df.empty:
+        return {"error": "데이터를 불러올 수 없습니다"}
+
+    if format == COLUMNAR_FORMAT:
+        return json_response(request, to_columnar(lotto_history_df))
+    return json_response(request, frame_to_records(lotto_history_df))
 
 
 @app.get("/api/analyze")
-def get_analysis(strategy: Optional[str] = None):
-    """번호 빈도 분석 및 추천"""
+def get_analysis(
+    request: Request,
+    strategy: Optional[str] = None,
+    view: Optional[str] = None,
+    format: Optional[str] = None,
+):
+    """번호 빈도 분석 및 추천 (view=gaps: 번호별 미출현 간격, format=columnar: 필드별 배열)"""
     if lotto_history_df.empty:
         load_lotto_data()
 
     if lotto_history_df.empty:
         return {"error": "데이터를 불러올 수 없습니다"}
 
-    freq = analyze_number_frequency(lotto_history_df)
+    freq = strategy_pools.context.freq if strategy_pools.context else None
     if freq is None:
         return {"error": "분석에 실패했습니다"}
 
-    # 전략별 추천
-    if strategy in ["top20", "bottom20"]:
-        recommended = get_recommended_numbers(freq, strategy)
-        return {"strategy": strategy, "numbers": recommended}
+    # 전략별 추천 (사전 계산된 풀에서 샘플링)
+    if strategy:
+        if get_strategy(strategy) is None:
+            return {"error": f"알 수 없는 전략입니다: {strategy}"}
+        return {"strategy": strategy, "numbers": strategy_pools.recommend(strategy)}
+
+    # 번호별 미출현 간격
+    if view == "gaps":
+        return json_response(request, gap_index.to_dict())
 
     # 전체 빈도 반환
-    return freq.to_dict()
+    if format == COLUMNAR_FORMAT:
+        return json_response(request, to_columnar(frequency_frame(freq)))
+    return json_response(request, freq.to_dict())
+
+
+@app.get("/api/ticket-history")
+def get_ticket_history(numbers: Optional[str] = None):
+    """티켓의 역대 전 회차 등수 분포 (numbers=1,2,3,4,5,6)"""
+    if lotto_history_df.empty:
+        load_lotto_data()
+
+    try:
+        return ticket_index.lookup(parse_ticket(numbers))
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/strategies")
+def get_strategies():
+    """등록된 추천 전략 목록"""
+    return available_strategies()
+
+
+@app.get("/api/statistics")
+def get_statistics(request: Request):
+    """당첨 번호 통계 검정 (균등성, 런, 연속번호, 홀짝, 합계 분포)"""
+    if lotto_history_df.empty:
+        load_lotto_data()
+
+    statistics = get_draw_statistics(lotto_history_df)
+    if statistics is None:
+        return {"error": "데이터를 불러올 수 없습니다"}
+    return json_response(request, statistics)
+
+
+@app.get("/api/transitions")
+def get_transitions(request: Request):
+    """연속 회차 간 번호 전이 분석 (반복 출현, 이월 개수 분포, 45x45 조건부 행렬)"""
+    if lotto_history_df.empty:
+        load_lotto_data()
+
+    if transition_index.pairs == 0:
+        return {"error": "데이터를 불러올 수 없습니다"}
+    return json_response(request, transition_index.to_dict())
+
+
+@app.get("/api/wheel")
+def get_wheel(
+    tickets: int = Query(10, ge=1, le=MAX_BUDGET),
+    cover: int = Query(2, ge=2, le=3),
+    strategy: Optional[str] = None,
+    pool: Optional[str] = None,
+):
+    """후보 풀의 번호 쌍/삼중쌍 커버리지를 최대화하는 티켓 묶음 (pool=1,2,... 또는 strategy=이름)"""
+    if lotto_history_df.empty:
+        load_lotto_data()
+
+    try:
+        if pool:
+            numbers = parse_ticket(pool)
+        elif strategy and strategy_pools.pool(strategy) is not None:
+            numbers = strategy_pools.pool(strategy).candidates.tolist()
+        else:
+            return {"error": "pool 또는 등록된 strategy가 필요합니다"}
+        return generate_portfolio(numbers, tickets, cover)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.post("/api/simulate")
+def simulate(simulation: SimulationRequest):
+    """티켓 포트폴리오의 등수별 확률 몬테카를로 추정 (시간/반복 한도 적용)"""
+    try:
+        return simulate_portfolio(**parse_simulation_request(simulation.model_dump()))
+    except ValueError as e:
+        return {"error": str(e)}
 
 
 @app.post("/api/update")
@@ -158,33 +433,35 @@ def update_history():
             last_saved_no = int(lotto_history_df["draw_no"].max())
 
         if last_saved_no >= latest_no:
+            if not snapshot_current:
+                # 스냅샷이 없거나 이전 데이터/전략 버전이면 최신 상태로 다시 게시
+                publish_snapshot()
             return {"message": "데이터가 이미 최신 상태입니다."}
 
-        # 새로운 회차 데이터 가져오기
-        new_draws = []
-        for i in range(last_saved_no + 1, latest_no + 1):
-            draw_data = get_lotto_win_numbers(i)
-            if draw_data:
-                new_draws.append(draw_data)
+        # 새로운 회차 데이터 가져오기 (동시 조회)
+        new_draws = fetch_draw_range(last_saved_no + 1, latest_no)
 
+        written = None
         if new_draws and db:
-            # Firebase에 저장
-            batch = db.batch()
-            collection_ref = db.collection(COLLECTION_LOTTO_HISTORY)
-
-            for draw_data in new_draws:
-                doc_ref = collection_ref.document(str(draw_data["draw_no"]))
-                batch.set(doc_ref, draw_data)
-
-            batch.commit()
-            print(f"Firebase에 새로운 회차 저장 완료: {len(new_draws)}개 회차")
-
-        # 데이터 다시 로드
-        load_lotto_data()
+            # Firebase에 저장 (배치 한도 단위로 나누어 커밋)
+            written = write_draws(db, new_draws)
+            print(f"Firebase에 새로운 회차 저장 완료: {len(written)}/{len(new_draws)}개 회차")
+
+        # 조회/저장에 성공한 연속 회차만 증분 반영 후 분석 스냅샷 게시
+        applied = consecutive_prefix(new_draws, last_saved_no + 1, written)
+        if applied:
+            append_draws(applied)
+            publish_snapshot()
+
+        if len(applied) < latest_no - last_saved_no:
+            failed_no = last_saved_no + len(applied) + 1
+            return {
+                "error": f"업데이트 실패: {failed_no}회 조회 또는 저장 실패 "
+                f"({len(applied)}개 회차만 반영, 다시 실행하면 {failed_no}회부터 재시도)"
+            }
 
         # 당첨자 확인
-        if new_draws:
-            stats_manager.check_winners(new_draws[-1])
+        stats_manager.check_winners(applied[-1])
 
         return {"message": f"{last_saved_no + 1}회부터 {latest_no}회까지 업데이트 완료"}
 
@@ -209,6 +486,34 @@ def get_weekly_stats():
     return stats_manager.get_stats_summary()
 
 
+@app.get("/api/ticket-popularity")
+def get_ticket_popularity(numbers: Optional[str] = None):
+    """이번 주에 같은 티켓을 선택한 횟수 (numbers 생략 시 인기 티켓 목록)"""
+    if numbers is None:
+        return stats_manager.get_ticket_popularity()
+    try:
+        return stats_manager.get_ticket_popularity(validate_ticket(parse_ticket(numbers)))
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/strategy-leaderboard")
+def get_strategy_leaderboard():
+    """전략별 누적 당첨 성적 (당첨률 내림차순)"""
+    return stats_manager.get_strategy_leaderboard()
+
+
+@app.get("/api/weekly-export")
+def export_weekly_selections(
+    week: Optional[str] = None,
+    rank: Optional[int] = Query(None, ge=0, le=5),
+    strategy: Optional[str] = None,
+):
+    """주간 사용자 선택과 등수를 NDJSON으로 스트리밍 (rank/strategy 필터)"""
+    pages = stats_manager.iter_export(week=week, rank=rank, strategy=strategy)
+    return StreamingResponse(profiled_stream(iter_ndjson(pages)), media_type=NDJSON_MEDIA_TYPE)
+
+
 @app.post("/api/check-winners")
 def manual_check_winners():
     """수동 당첨자 확인 (테스트용)"""
@@ -228,6 +533,28 @@ def manual_reset_week():
     return {"message": "주간 통계가 초기화되었습니다."}
 
 @app.get("/api/weekly-history")
-def get_weekly_history():
-    """주간 통계 히스토리 조회"""
-    return stats_manager.get_history()
+def get_weekly_history(
+    limit: int = Query(10, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    start_after: Optional[str] = None,
+):
+    """주간 통계 히스토리 조회 (다음 페이지는 마지막 항목의 week를 start_after로 전달)"""
+    return stats_manager.get_history(limit, start_after)
+
+
+@app.get("/api/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """보관 중인 요청 프로파일 목록 (관리자용)"""
+    if not request_profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
+    return request_profiler.list_profiles()
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """요청 프로파일을 collapsed stack 텍스트로 반환 (flamegraph.pl/speedscope 입력)"""
+    if not request_profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
+    session = request_profiler.get_profile(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return PlainTextResponse(session.collapsed())
@@ -0,0 +1,4 @@
+"""
+벤치마크 및 부하 테스트 모듈
+shared 핫패스 성능 측정과 인메모리 Firestore 대체 구현
+"""
@@ -0,0 +1,285 @@
+"""
+shared 모듈 마이크로벤치마크
+핫패스 실행 시간을 측정하고 저장된 기준값(baseline)과 비교
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_shared                       # 측정 + 기준값 비교
+    python -m benchmarks.bench_shared --save-baseline       # 기준값 갱신
+    python -m benchmarks.bench_shared --sizes 1000 100000   # 티켓 규모 지정
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+# shared 모듈 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+
+from shared.analysis import analyze_number_frequency, get_recommended_numbers
+from shared.strategies import AnalysisContext, StrategyPools
+from shared.serialization import encode_response, frame_to_records, to_columnar
+from shared.weekly_stats import (
+    WeeklyStatsManager,
+    calculate_prize_rank,
+    get_current_week,
+)
+from benchmarks.fake_firestore import FakeFirestore
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_CSV = os.path.join(BENCH_DIR, "..", "backend", "lotto_history.csv")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+
+DEFAULT_TICKET_SIZES = [1_000, 100_000, 1_000_000]
+
+# 기준값 대비 이 비율 이상 느려지면 회귀로 판단
+DEFAULT_TOLERANCE = 0.25
+
+STRATEGIES = ["top20", "bottom20"]
+
+
+def load_history() -> pd.DataFrame:
+    """벤치마크용 로또 히스토리를 CSV에서 로드합니다."""
+    return pd.read_csv(HISTORY_CSV)
+
+
+def random_tickets(count: int, seed: int = 42) -> list[list[int]]:
+    """재현 가능한 무작위 티켓 목록을 생성합니다."""
+    rng = random.Random(seed)
+    population = range(1, 46)
+    return [sorted(rng.sample(population, 6)) for _ in range(count)]
+
+
+def make_stats_manager(db: FakeFirestore, tickets: list[list[int]]) -> WeeklyStatsManager:
+    """티켓이 채워진 WeeklyStatsManager를 생성합니다."""
+    manager = WeeklyStatsManager(db)
+    users = [
+        {
+            "user_id": f"bench_{i}",
+            "numbers": numbers,
+            "strategy": STRATEGIES[i % len(STRATEGIES)],
+            "timestamp": "",
+        }
+        for i, numbers in enumerate(tickets)
+    ]
+    manager._stats = {"users": users, "current_week": get_current_week(), "results": {}}
+    return manager
+
+
+def measure(
+    func: Callable[[], object],
+    repeat: int,
+    number: int = 1,
+    setup: Optional[Callable[[], object]] = None,
+) -> dict:
+    """
+    함수를 반복 실행하여 호출 1회당 시간 통계를 반환합니다.
+
+    Args:
+        func: 측정할 함수
+        repeat: 반복 측정 횟수
+        number: 측정 1회당 호출 횟수
+        setup: 측정 전마다 실행할 준비 함수 (시간에 포함되지 않음)
+
+    Returns:
+        min/median/mean 초 단위 통계
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def run_benchmarks(sizes: list[int], repeat: int, latency: float) -> dict[str, dict]:
+    """
+    모든 벤치마크를 실행합니다.
+
+    Args:
+        sizes: check_winners 티켓 규모 목록
+        repeat: 반복 측정 횟수
+        latency: 가짜 Firestore RPC 지연 (초)
+
+    Returns:
+        벤치마크 이름 → 측정 결과 딕셔너리
+    """
+    results: dict[str, dict] = {}
+    df = load_history()
+    freq = analyze_number_frequency(df)
+    latest_draw = df.iloc[-1].to_dict()
+    winning_numbers = [int(latest_draw[f"num{i}"]) for i in range(1, 7)]
+    bonus_number = int(latest_draw["bonus"])
+
+    results["analyze_number_frequency"] = measure(
+        lambda: analyze_number_frequency(df), repeat, number=20
+    )
+
+    for strategy in STRATEGIES:
+        results[f"get_recommended_numbers[{strategy}]"] = measure(
+            lambda: get_recommended_numbers(freq, strategy), repeat, number=200
+        )
+
+    pools = StrategyPools()
+    results["strategy_pools.refresh"] = measure(
+        lambda: pools.refresh(AnalysisContext(df)), repeat, number=5
+    )
+    for strategy in STRATEGIES:
+        results[f"strategy_pools.recommend[{strategy}]"] = measure(
+            lambda: pools.recommend(strategy), repeat, number=200
+        )
+
+    tickets_1k = random_tickets(1_000)
+    results["calculate_prize_rank[x1000]"] = measure(
+        lambda: [
+            calculate_prize_rank(t, winning_numbers, bonus_number) for t in tickets_1k
+        ],
+        repeat,
+    )
+
+    for size in sizes:
+        db = FakeFirestore(latency=latency)
+        manager = make_stats_manager(db, random_tickets(size))
+        results[f"check_winners[{size}]"] = measure(
+            lambda: manager.check_winners(latest_draw),
+            repeat if size < 1_000_000 else max(1, repeat // 3),
+        )
+        results[f"check_winners[{size}]"]["firestore"] = db.counters()
+
+    db = FakeFirestore(latency=latency)
+    manager = make_stats_manager(db, random_tickets(1_000))
+    manager.check_winners(latest_draw)
+    results["get_stats_summary[1000]"] = measure(
+        manager.get_stats_summary, repeat, number=50
+    )
+
+    results["history_serialization[to_dict]"] = measure(
+        lambda: df.to_dict(orient="records"), repeat, number=5
+    )
+    results["history_serialization[json]"] = measure(
+        lambda: json.dumps(df.to_dict(orient="records")), repeat, number=5
+    )
+    results["history_serialization[fast]"] = measure(
+        lambda: encode_response(frame_to_records(df)), repeat, number=5
+    )
+    results["history_serialization[columnar]"] = measure(
+        lambda: encode_response(to_columnar(df)), repeat, number=5
+    )
+    results["history_serialization[columnar+gzip]"] = measure(
+        lambda: encode_response(to_columnar(df), "gzip"), repeat, number=5
+    )
+
+    return results
+
+
+def compare_with_baseline(
+    results: dict[str, dict], baseline: dict[str, dict], tolerance: float
+) -> list[dict]:
+    """
+    측정 결과를 기준값과 비교합니다.
+
+    Args:
+        results: 이번 측정 결과
+        baseline: 저장된 기준값
+        tolerance: 회귀로 판단할 상대 증가율
+
+    Returns:
+        벤치마크별 비교 결과 리스트
+    """
+    comparison = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            comparison.append({"name": name, "status": "new", "ratio": None})
+            continue
+
+        ratio = result["median"] / base["median"] if base["median"] else None
+        if ratio is None:
+            status = "unknown"
+        elif ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 - tolerance:
+            status = "improvement"
+        else:
+            status = "ok"
+        comparison.append({"name": name, "status": status, "ratio": ratio})
+    return comparison
+
+
+def print_report(results: dict[str, dict], comparison: Optional[list[dict]]) -> None:
+    """측정 결과를 표 형태로 출력합니다."""
+    by_name = {item["name"]: item for item in comparison or []}
+    print(f"{'benchmark':<40} {'median':>12} {'min':>12}  baseline")
+    for name, result in results.items():
+        item = by_name.get(name)
+        note = ""
+        if item and item["ratio"] is not None:
+            note = f"x{item['ratio']:.2f} {item['status']}"
+        elif item:
+            note = item["status"]
+        print(
+            f"{name:<40} {result['median'] * 1e3:>10.3f}ms {result['min'] * 1e3:>10.3f}ms  {note}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="shared 모듈 마이크로벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_TICKET_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Firestore RPC 지연 (초)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.latency)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    comparison = (
+        compare_with_baseline(results, baseline, args.tolerance) if baseline else None
+    )
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"sizes": args.sizes, "repeat": args.repeat, "latency": args.latency},
+        "results": results,
+        "comparison": comparison,
+    }
+    output_path = args.baseline if args.save_baseline else args.output
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print_report(results, comparison)
+    print(f"\n결과 저장: {output_path}")
+
+    regressions = [item for item in comparison or [] if item["status"] == "regression"]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
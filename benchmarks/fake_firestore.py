@@ -0,0 +1,291 @@
+"""
+인메모리 Firestore 대체 모듈
+벤치마크와 부하 테스트에서 실제 Firestore 없이 동일한 호출 경로를 재현
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Optional
+
+# Firestore 배치 1회당 최대 쓰기 수
+MAX_BATCH_WRITES = 500
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "array_contains": lambda a, b: b in (a or []),
+}
+
+
+class FakeDocumentSnapshot:
+    """문서 스냅샷 (google.cloud.firestore.DocumentSnapshot 대응)"""
+
+    def __init__(self, doc_id: str, data: Optional[dict]):
+        self.id = doc_id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    """문서 참조"""
+
+    def __init__(self, client: "FakeFirestore", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return self._client.collection(f"{self._collection}/{self.id}/{name}")
+
+    def get(self, field_paths: Optional[list[str]] = None) -> FakeDocumentSnapshot:
+        self._client._rpc(reads=1)
+        data = self._client._read(self._collection, self.id)
+        if data is not None and field_paths is not None:
+            # 최상위 필드 경로만 지원
+            data = {field: data[field] for field in field_paths if field in data}
+        return FakeDocumentSnapshot(self.id, data)
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._client._rpc(writes=1)
+        self._client._write(self._collection, self.id, data, merge)
+
+    def create(self, data: dict) -> None:
+        from google.api_core.exceptions import AlreadyExists
+
+        self._client._rpc(writes=1)
+        if not self._client._create(self._collection, self.id, data):
+            raise AlreadyExists(f"문서가 이미 존재합니다: {self._collection}/{self.id}")
+
+    def update(self, data: dict) -> None:
+        self._client._rpc(writes=1)
+        if self._client._read(self._collection, self.id) is None:
+            raise KeyError(f"문서가 존재하지 않습니다: {self._collection}/{self.id}")
+        self._client._write(self._collection, self.id, data, merge=True)
+
+    def delete(self) -> None:
+        self._client._rpc(writes=1)
+        self._client._delete(self._collection, self.id)
+
+
+class FakeQuery:
+    """컬렉션 쿼리 (where / order_by / start_after / limit 지원)"""
+
+    def __init__(
+        self,
+        client: "FakeFirestore",
+        collection: str,
+        filters: tuple = (),
+        orders: tuple = (),
+        cursor: Optional[dict] = None,
+        limit_count: Optional[int] = None,
+    ):
+        self._client = client
+        self._collection = collection
+        self._filters = filters
+        self._orders = orders
+        self._cursor = cursor
+        self._limit = limit_count
+
+    def _copy(self, **changes: Any) -> "FakeQuery":
+        params = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "cursor": self._cursor,
+            "limit_count": self._limit,
+        }
+        params.update(changes)
+        return FakeQuery(self._client, self._collection, **params)
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(orders=self._orders + ((field, direction),))
+
+    def start_after(self, values: Any) -> "FakeQuery":
+        if isinstance(values, FakeDocumentSnapshot):
+            values = values.to_dict() or {}
+        return self._copy(cursor=values)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit_count=count)
+
+    def _matches(self, data: dict) -> bool:
+        for field, op, value in self._filters:
+            if field not in data or not _OPERATORS[op](data[field], value):
+                return False
+        return True
+
+    def _after_cursor(self, data: dict) -> bool:
+        for field, direction in self._orders:
+            left, right = data.get(field), self._cursor.get(field)
+            if left == right:
+                continue
+            return left < right if direction == "DESCENDING" else left > right
+        return False
+
+    def get(self) -> list[FakeDocumentSnapshot]:
+        docs = [
+            (doc_id, data)
+            for doc_id, data in self._client._scan(self._collection)
+            if self._matches(data)
+        ]
+        for field, direction in reversed(self._orders):
+            docs = [item for item in docs if field in item[1]]
+            docs.sort(key=lambda item: item[1][field], reverse=direction == "DESCENDING")
+        if self._cursor is not None:
+            docs = [item for item in docs if self._after_cursor(item[1])]
+        if self._limit is not None:
+            docs = docs[: self._limit]
+
+        self._client._rpc(reads=max(len(docs), 1))
+        return [FakeDocumentSnapshot(doc_id, copy.deepcopy(data)) for doc_id, data in docs]
+
+    def stream(self):
+        yield from self.get()
+
+
+class FakeCollectionReference(FakeQuery):
+    """컬렉션 참조"""
+
+    def __init__(self, client: "FakeFirestore", name: str):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, doc_id: Optional[str] = None) -> FakeDocumentReference:
+        if doc_id is None:
+            doc_id = self._client._next_id()
+        return FakeDocumentReference(self._client, self._collection, str(doc_id))
+
+
+class FakeWriteBatch:
+    """쓰기 배치 (Firestore와 동일하게 500건 제한)"""
+
+    def __init__(self, client: "FakeFirestore"):
+        self._client = client
+        self._writes: list[tuple] = []
+
+    def _add(self, op: str, ref: FakeDocumentReference, data: Optional[dict] = None, merge: bool = False) -> None:
+        if len(self._writes) >= MAX_BATCH_WRITES:
+            raise ValueError(f"배치당 최대 {MAX_BATCH_WRITES}건까지 쓸 수 있습니다")
+        self._writes.append((op, ref, data, merge))
+
+    def set(self, ref: FakeDocumentReference, data: dict, merge: bool = False) -> None:
+        self._add("set", ref, data, merge)
+
+    def update(self, ref: FakeDocumentReference, data: dict) -> None:
+        self._add("set", ref, data, True)
+
+    def delete(self, ref: FakeDocumentReference) -> None:
+        self._add("delete", ref)
+
+    def commit(self) -> list:
+        self._client._rpc(writes=len(self._writes))
+        for op, ref, data, merge in self._writes:
+            if op == "delete":
+                self._client._delete(ref._collection, ref.id)
+            else:
+                self._client._write(ref._collection, ref.id, data, merge)
+        committed, self._writes = self._writes, []
+        return committed
+
+
+class FakeFirestore:
+    """
+    인메모리 Firestore 클라이언트.
+
+    shared 모듈이 사용하는 collection/document/batch API만 흉내 내며,
+    RPC마다 latency(초)만큼 지연하고 읽기/쓰기 횟수를 집계합니다.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: RPC 1회당 인위적 지연 시간 (초)
+        """
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self.rpcs = 0
+        self._data: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        self._id_counter = 0
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def reset_counters(self) -> None:
+        """읽기/쓰기 집계를 초기화합니다."""
+        self.reads = self.writes = self.rpcs = 0
+
+    def counters(self) -> dict:
+        return {"rpcs": self.rpcs, "reads": self.reads, "writes": self.writes}
+
+    def _rpc(self, reads: int = 0, writes: int = 0) -> None:
+        with self._lock:
+            self.rpcs += 1
+            self.reads += reads
+            self.writes += writes
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _next_id(self) -> str:
+        with self._lock:
+            self._id_counter += 1
+            return f"auto_{self._id_counter:012d}"
+
+    def _read(self, collection: str, doc_id: str) -> Optional[dict]:
+        with self._lock:
+            data = self._data.get(collection, {}).get(doc_id)
+            return copy.deepcopy(data)
+
+    def _scan(self, collection: str) -> list[tuple[str, dict]]:
+        with self._lock:
+            return list(self._data.get(collection, {}).items())
+
+    def _create(self, collection: str, doc_id: str, data: dict) -> bool:
+        with self._lock:
+            docs = self._data.setdefault(collection, {})
+            if doc_id in docs:
+                return False
+            docs[doc_id] = copy.deepcopy(data)
+            return True
+
+    def _write(self, collection: str, doc_id: str, data: dict, merge: bool) -> None:
+        with self._lock:
+            docs = self._data.setdefault(collection, {})
+            current = docs.get(doc_id, {}) if merge else {}
+            resolved = {}
+            for field, value in data.items():
+                # ArrayUnion 변환: 기존 배열에 없는 원소만 덧붙임
+                if type(value).__name__ == "ArrayUnion":
+                    array = list(current.get(field, []))
+                    array.extend(item for item in value.values if item not in array)
+                    value = array
+                resolved[field] = copy.deepcopy(value)
+            if merge and doc_id in docs:
+                docs[doc_id].update(resolved)
+            else:
+                docs[doc_id] = resolved
+
+    def _delete(self, collection: str, doc_id: str) -> None:
+        with self._lock:
+            self._data.get(collection, {}).pop(doc_id, None)
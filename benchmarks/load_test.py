@@ -0,0 +1,316 @@
+"""
+API 부하 테스트 모듈
+추첨일 트래픽 곡선을 재현하여 엔드포인트별 처리량/지연/에러율 측정
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.load_test                              # 인프로세스 + 가짜 Firestore
+    python -m benchmarks.load_test --latency 0.03               # Firestore 지연 30ms 가정
+    python -m benchmarks.load_test --base-url http://localhost:8000
+    python -m benchmarks.load_test --mix-file my_mix.json       # 트래픽 구성 지정
+
+트래픽 구성 파일 형식:
+    [{"name": "browse", "duration": 10, "concurrency": 20,
+      "mix": {"analyze_top20": 30, "save_selection": 25, "weekly_stats": 20}}]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+# shared 모듈 경로 추가
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from shared.backfill import write_draws
+from shared.weekly_stats import WeeklyStatsManager
+from benchmarks.fake_firestore import FakeFirestore
+
+HISTORY_CSV = os.path.join(ROOT_DIR, "backend", "lotto_history.csv")
+
+# 인프로세스 모드에서 /api/update 가 새로 받아올 회차 수
+PENDING_DRAWS = 1
+
+
+def _random_ticket() -> list[int]:
+    return sorted(random.sample(range(1, 46), 6))
+
+
+# 엔드포인트 이름 → (메서드, 경로, 요청 본문 생성 함수)
+ENDPOINTS: dict[str, tuple[str, str, Optional[Callable[[], dict]]]] = {
+    "history": ("GET", "/api/history", None),
+    "analyze": ("GET", "/api/analyze", None),
+    "analyze_top20": ("GET", "/api/analyze?strategy=top20", None),
+    "analyze_bottom20": ("GET", "/api/analyze?strategy=bottom20", None),
+    "save_selection": (
+        "POST",
+        "/api/save-selection",
+        lambda: {
+            "numbers": _random_ticket(),
+            "strategy": random.choice(["top20", "bottom20"]),
+        },
+    ),
+    "weekly_stats": ("GET", "/api/weekly-stats", None),
+    "weekly_history": ("GET", "/api/weekly-history", None),
+    "update": ("POST", "/api/update", None),
+    "check_winners": ("POST", "/api/check-winners", None),
+}
+
+# 기본 추첨일 트래픽: 평시 조회/저장 → 추첨 직후 결과 폴링 + 업데이트 스파이크
+DEFAULT_PHASES = [
+    {
+        "name": "pre_draw",
+        "duration": 10,
+        "concurrency": 20,
+        "mix": {
+            "analyze_top20": 30,
+            "analyze_bottom20": 20,
+            "save_selection": 30,
+            "weekly_stats": 15,
+            "history": 5,
+        },
+    },
+    {
+        "name": "draw_spike",
+        "duration": 5,
+        "concurrency": 50,
+        "mix": {
+            "update": 1,
+            "check_winners": 4,
+            "weekly_stats": 70,
+            "analyze": 15,
+            "weekly_history": 10,
+        },
+    },
+]
+
+
+class OfflineDrawSource:
+    """CSV 기반 당첨번호 제공자 (동행복권 HTTP 호출 대체)"""
+
+    def __init__(self, df: pd.DataFrame):
+        self._draws = {
+            int(row["draw_no"]): {key: int(value) for key, value in row.items()}
+            for row in df.to_dict(orient="records")
+        }
+        self.latest = max(self._draws)
+
+    def get_latest_draw_number(self, timeout: int = 0) -> Optional[int]:
+        return self.latest
+
+    def get_lotto_win_numbers(self, draw_no: int, timeout: int = 0) -> Optional[dict]:
+        draw = self._draws.get(draw_no)
+        return dict(draw) if draw else None
+
+    def fetch_draw_range(self, start_no: int, end_no: int, workers: int = 0) -> list[dict]:
+        draws = (self.get_lotto_win_numbers(n) for n in range(start_no, end_no + 1))
+        return [draw for draw in draws if draw]
+
+
+def build_inprocess_app(latency: float) -> tuple[Any, FakeFirestore]:
+    """
+    가짜 Firestore에 연결된 FastAPI 앱을 인프로세스로 구성합니다.
+
+    최신 PENDING_DRAWS 회차는 Firestore에서 빼 두어 /api/update 가 실제로
+    새 회차를 저장하고 check_winners 를 실행하도록 합니다.
+
+    Args:
+        latency: 가짜 Firestore RPC 지연 (초)
+
+    Returns:
+        (ASGI 앱, 가짜 Firestore) 튜플
+    """
+    sys.path.insert(0, os.path.join(ROOT_DIR, "backend"))
+    import main as backend_main
+
+    history = pd.read_csv(HISTORY_CSV)
+    source = OfflineDrawSource(history)
+
+    db = FakeFirestore()
+    records = [
+        {key: int(value) for key, value in record.items()}
+        for record in history.iloc[:-PENDING_DRAWS].to_dict(orient="records")
+    ]
+    write_draws(db, records)
+    db.latency = latency
+    db.reset_counters()
+
+    backend_main.db = db
+    backend_main.stats_manager = WeeklyStatsManager(db)
+    backend_main.stats_manager.load()
+    backend_main.get_latest_draw_number = source.get_latest_draw_number
+    backend_main.fetch_draw_range = source.fetch_draw_range
+    backend_main.load_lotto_data()
+
+    return backend_main.app, db
+
+
+def _is_error(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    return isinstance(body, dict) and "error" in body
+
+
+async def run_phase(
+    client: httpx.AsyncClient, phase: dict, samples: dict[str, list], errors: dict[str, int]
+) -> float:
+    """
+    한 단계의 트래픽을 지정 시간 동안 발생시킵니다.
+
+    Args:
+        client: HTTP 클라이언트
+        phase: 단계 설정 (duration, concurrency, mix)
+        samples: 엔드포인트별 지연 시간(초) 누적 딕셔너리
+        errors: 엔드포인트별 에러 횟수 누적 딕셔너리
+
+    Returns:
+        실제 경과 시간 (초)
+    """
+    names = list(phase["mix"].keys())
+    weights = list(phase["mix"].values())
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        raise ValueError(f"알 수 없는 엔드포인트: {unknown}")
+
+    start = time.perf_counter()
+    deadline = start + phase["duration"]
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            method, path, body_factory = ENDPOINTS[name]
+            body = body_factory() if body_factory else None
+
+            request_start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                failed = _is_error(response)
+            except httpx.HTTPError:
+                failed = True
+            samples[name].append(time.perf_counter() - request_start)
+            if failed:
+                errors[name] += 1
+
+    await asyncio.gather(*(worker() for _ in range(phase["concurrency"])))
+    return time.perf_counter() - start
+
+
+def summarize(samples: dict[str, list], errors: dict[str, int], elapsed: float) -> dict:
+    """엔드포인트별 처리량, p50/p95/p99 지연(ms), 에러율을 계산합니다."""
+    report = {}
+    for name, latencies in sorted(samples.items()):
+        values = np.asarray(latencies) * 1e3
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        report[name] = {
+            "requests": len(values),
+            "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(values.max()),
+            "error_rate": errors[name] / len(values),
+        }
+    return report
+
+
+def print_report(phase_name: str, report: dict) -> None:
+    print(f"\n[{phase_name}]")
+    print(
+        f"{'endpoint':<18} {'reqs':>7} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>7}"
+    )
+    for name, row in report.items():
+        print(
+            f"{name:<18} {row['requests']:>7} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms "
+            f"{row['error_rate'] * 100:>6.2f}%"
+        )
+
+
+async def run_load_test(
+    phases: list[dict], base_url: Optional[str], latency: float, timeout: float
+) -> dict:
+    """
+    모든 단계를 순서대로 실행하고 단계별 리포트를 반환합니다.
+
+    Args:
+        phases: 트래픽 단계 목록
+        base_url: 대상 서버 주소 (None이면 인프로세스 앱 사용)
+        latency: 인프로세스 모드의 가짜 Firestore RPC 지연 (초)
+        timeout: 요청 타임아웃 (초)
+
+    Returns:
+        단계 이름 → 엔드포인트별 리포트
+    """
+    db = None
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=timeout)
+    else:
+        app, db = build_inprocess_app(latency)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=timeout,
+        )
+
+    reports = {}
+    async with client:
+        for phase in phases:
+            samples: dict[str, list] = defaultdict(list)
+            errors: dict[str, int] = defaultdict(int)
+            elapsed = await run_phase(client, phase, samples, errors)
+            reports[phase["name"]] = summarize(samples, errors, elapsed)
+            print_report(phase["name"], reports[phase["name"]])
+
+    if db is not None:
+        reports["_firestore"] = db.counters()
+    return reports
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="추첨일 트래픽 부하 테스트")
+    parser.add_argument("--base-url", help="대상 서버 주소 (미지정 시 인프로세스)")
+    parser.add_argument("--mix-file", help="트래픽 단계 구성 JSON 파일")
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 Firestore RPC 지연 (초)")
+    parser.add_argument("--duration-scale", type=float, default=1.0, help="단계별 시간 배율")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    phases = DEFAULT_PHASES
+    if args.mix_file:
+        with open(args.mix_file, encoding="utf-8") as f:
+            phases = json.load(f)
+    phases = [
+        {**phase, "duration": phase["duration"] * args.duration_scale} for phase in phases
+    ]
+
+    reports = asyncio.run(
+        run_load_test(phases, args.base_url, args.latency, args.timeout)
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+        print(f"\n결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
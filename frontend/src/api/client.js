@@ -54,16 +54,37 @@ export async function fetchRecommendation(strategy) {
   return request(`/api/analyze?strategy=${strategy}`);
 }
 
+const USER_ID_KEY = 'lotto_user_id';
+
+/**
+ * 서버가 발급한 사용자 ID (같은 번호 중복 저장 방지용)
+ */
+function getUserId() {
+  try {
+    return localStorage.getItem(USER_ID_KEY) || undefined;
+  } catch {
+    return undefined;
+  }
+}
+
 /**
  * 사용자 선택 저장
  * @param {number[]} numbers - 선택한 번호들
  * @param {string} strategy - 사용한 전략
  */
 export async function saveSelection(numbers, strategy) {
-  return request('/api/save-selection', {
+  const result = await request('/api/save-selection', {
     method: 'POST',
-    body: JSON.stringify({ numbers, strategy }),
+    body: JSON.stringify({ numbers, strategy, user_id: getUserId() }),
   });
+  if (result.user_id) {
+    try {
+      localStorage.setItem(USER_ID_KEY, result.user_id);
+    } catch {
+      // 저장소를 쓸 수 없으면 매번 새 ID를 발급받습니다
+    }
+  }
+  return result;
 }
 
 /**
@@ -55,6 +55,10 @@ export function useLottoApi() {
     const result = await withLoading(() => api.saveSelection(numbers, strategy));
     if (result.success) {
       setMessage(`${result.message} (총 ${result.user_count}회 참여)`);
+    } else if (result.duplicate) {
+      setMessage(result.message);
+    } else if (result.error) {
+      setError(result.error);
     }
     return result;
   }, [withLoading]);
@@ -10,12 +10,38 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import pandas as pd
 import json
+from typing import Optional
 from firebase_functions import https_fn, scheduler_fn, options
 
-from shared.constants import COLLECTION_LOTTO_HISTORY
-from shared.lotto_api import get_lotto_win_numbers, get_latest_draw_number
-from shared.analysis import analyze_number_frequency, get_recommended_numbers
+from shared.constants import COLLECTION_LOTTO_HISTORY, MAX_HISTORY_PAGE_SIZE
+from shared.lotto_api import fetch_draw_range, get_latest_draw_number
+from shared.backfill import consecutive_prefix, write_draws
+from shared.analysis import GapIndex, TransitionIndex
+from shared.strategies import AnalysisContext, StrategyPools, available_strategies, get_strategy
+from shared.draw_statistics import get_draw_statistics
+from shared.snapshot import AnalysisSnapshot
+from shared.simulation import parse_simulation_request, simulate_portfolio
+from shared.wheeling import MAX_BUDGET, generate_portfolio
+from shared.ticket_index import TicketHistoryIndex, parse_ticket, validate_ticket
 from shared.weekly_stats import WeeklyStatsManager
+from shared.serialization import (
+    COLUMNAR_FORMAT,
+    NDJSON_MEDIA_TYPE,
+    encode_response,
+    frame_to_records,
+    frequency_frame,
+    iter_ndjson,
+    to_columnar,
+)
+from shared.profiling import (
+    ADMIN_TOKEN_HEADER,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILE_QUERY_PARAM,
+    RequestProfiler,
+    profiled_stream,
+    thread_scope,
+)
 from shared.firebase_client import get_firestore_client_for_functions
 
 # Firestore 클라이언트
@@ -27,28 +53,127 @@ stats_manager = WeeklyStatsManager(db)
 # 로또 데이터 DataFrame
 lotto_history_df = pd.DataFrame()
 
+# 번호별 미출현 간격 인덱스
+gap_index = GapIndex()
 
-def load_lotto_data() -> pd.DataFrame:
-    """Firebase에서 로또 데이터를 로드합니다."""
+# 번호별 출현 회차 비트셋 역색인
+ticket_index = TicketHistoryIndex()
+
+# 연속 회차 간 번호 전이 인덱스
+transition_index = TransitionIndex()
+
+# 전략별 사전 계산된 후보 풀 (데이터 버전마다 갱신)
+strategy_pools = StrategyPools()
+
+# 게시된 분석 스냅샷이 현재 데이터/전략 버전과 같은지 (다르면 업데이트 파이프라인이 다시 게시)
+snapshot_current = False
+
+# 요청 프로파일러 (관리자 요청 + LOTTO_PROFILE_SAMPLE_RATE 비율 자동 수집, 인스턴스별 보관)
+request_profiler = RequestProfiler()
+
+
+def refresh_strategy_pools() -> None:
+    """현재 데이터와 인덱스로 전략별 후보 풀을 다시 계산합니다."""
+    strategy_pools.refresh(
+        AnalysisContext(
+            lotto_history_df, gap_index=gap_index, transition_index=transition_index
+        )
+    )
+
+
+def refresh_analysis_state() -> None:
+    """로또 데이터 전체가 다시 로드되면 파생 인덱스를 재구성합니다."""
+    global gap_index, ticket_index, transition_index
+    
+    gap_index = GapIndex.from_history(lotto_history_df)
+    ticket_index = TicketHistoryIndex.from_history(lotto_history_df)
+    transition_index = TransitionIndex.from_history(lotto_history_df)
+    refresh_strategy_pools()
+
+
+def append_draws(new_draws: list) -> None:
+    """새 회차를 DataFrame과 파생 인덱스에 증분 반영합니다."""
     global lotto_history_df
     
+    lotto_history_df = pd.concat(
+        [lotto_history_df, pd.DataFrame(new_draws)], ignore_index=True
+    )
+    for draw_data in new_draws:
+        gap_index.update(draw_data)
+        ticket_index.update(draw_data)
+        transition_index.update(draw_data)
+    refresh_strategy_pools()
+
+
+def fetch_saved_draws(after: int = 0) -> list:
+    """Firebase에 저장된 회차를 회차순으로 가져옵니다 (after 회차 이후만)."""
+    query = db.collection(COLLECTION_LOTTO_HISTORY).order_by('draw_no')
+    if after:
+        query = query.start_after({'draw_no': after})
+    
+    firebase_data = []
+    for doc in query.get():
+        data = doc.to_dict()
+        firebase_data.append({
+            'draw_no': data['draw_no'],
+            'num1': data['num1'], 'num2': data['num2'],
+            'num3': data['num3'], 'num4': data['num4'],
+            'num5': data['num5'], 'num6': data['num6'],
+            'bonus': data['bonus']
+        })
+    return firebase_data
+
+
+def apply_snapshot(snapshot: AnalysisSnapshot) -> None:
+    """게시된 분석 스냅샷으로 데이터와 파생 인덱스를 다시 계산 없이 복원합니다."""
+    global lotto_history_df, gap_index, ticket_index, transition_index, snapshot_current
+    
+    lotto_history_df = snapshot.df
+    gap_index = snapshot.gap_index
+    transition_index = snapshot.transition_index
+    ticket_index = TicketHistoryIndex.from_history(lotto_history_df)
+    rebuilt = strategy_pools.restore(snapshot.context(), snapshot.pools)
+    if rebuilt:
+        print(f"전략 버전이 달라 후보 풀을 다시 계산: {', '.join(rebuilt)}")
+    snapshot_current = not rebuilt
+
+
+def publish_snapshot() -> None:
+    """
+    현재 분석 상태를 스냅샷 문서로 게시합니다.
+    업데이트 파이프라인에서만 호출합니다 (콜드 인스턴스는 읽기만 함).
+    """
+    global snapshot_current
+    
+    if db and not lotto_history_df.empty:
+        snapshot_current = AnalysisSnapshot.capture(
+            lotto_history_df, gap_index, transition_index, strategy_pools
+        ).publish(db)
+
+
+def load_lotto_data() -> pd.DataFrame:
+    """분석 스냅샷 또는 Firebase에서 로또 데이터를 로드합니다."""
+    global lotto_history_df, snapshot_current
+    
     try:
         if db:
-            collection_ref = db.collection(COLLECTION_LOTTO_HISTORY)
-            docs = collection_ref.order_by('draw_no').get()
-            
-            if docs:
-                firebase_data = []
-                for doc in docs:
-                    data = doc.to_dict()
-                    firebase_data.append({
-                        'draw_no': data['draw_no'],
-                        'num1': data['num1'], 'num2': data['num2'],
-                        'num3': data['num3'], 'num4': data['num4'],
-                        'num5': data['num5'], 'num6': data['num6'],
-                        'bonus': data['bonus']
-                    })
+            snapshot = AnalysisSnapshot.load(db)
+            if snapshot is not None:
+                apply_snapshot(snapshot)
+                # 스냅샷 게시 이후 저장된 회차만 이어서 반영
+                newer_draws = fetch_saved_draws(after=snapshot.latest_draw)
+                if newer_draws:
+                    # 게시는 업데이트 파이프라인이 맡으므로 여기서는 반영만 합니다
+                    append_draws(newer_draws)
+                    snapshot_current = False
+                return lotto_history_df
+            
+            firebase_data = fetch_saved_draws()
+            if firebase_data:
                 lotto_history_df = pd.DataFrame(firebase_data)
+                refresh_analysis_state()
+                # 스냅샷이 없거나 스키마가 바뀐 경우 다음 업데이트 실행에서 게시
+                snapshot_current = False
                 return lotto_history_df
     except Exception as e:
         print(f"로또 데이터 로드 실패: {e}")
@@ -56,20 +181,37 @@ def load_lotto_data() -> pd.DataFrame:
     return pd.DataFrame()
 
 
-def create_response(data, status: int = 200) -> https_fn.Response:
-    """JSON 응답을 생성합니다."""
-    headers = {
+def create_response(
+    data, status: int = 200, req: Optional[https_fn.Request] = None
+) -> https_fn.Response:
+    """JSON 응답을 생성합니다. 요청이 주어지면 Accept-Encoding에 맞춰 압축합니다."""
+    accept_encoding = req.headers.get("Accept-Encoding") if req else None
+    body, headers = encode_response(data, accept_encoding)
+    headers.update({
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
         "Access-Control-Allow-Headers": "Content-Type",
-        "Content-Type": "application/json"
-    }
-    return https_fn.Response(json.dumps(data), status=status, headers=headers)
+    })
+    return https_fn.Response(body, status=status, headers=headers)
 
 
 @https_fn.on_request()
 def lotto_api(req: https_fn.Request) -> https_fn.Response:
-    """로또 API 메인 엔드포인트"""
+    """로또 API 메인 엔드포인트 (관리자 요청/샘플링된 요청은 프로파일링)"""
+    forced = request_profiler.is_requested(
+        req.headers.get(PROFILE_HEADER) or req.args.get(PROFILE_QUERY_PARAM),
+        req.headers.get(ADMIN_TOKEN_HEADER),
+    )
+    with request_profiler.profile(f"{req.method} {req.path}", forced) as session:
+        with thread_scope():
+            response = handle_request(req)
+    if session is not None and forced:
+        response.headers[PROFILE_ID_HEADER] = session.id
+    return response
+
+
+def handle_request(req: https_fn.Request) -> https_fn.Response:
+    """경로별 요청 처리"""
     global lotto_history_df
     
     # CORS preflight
@@ -84,7 +226,9 @@ def lotto_api(req: https_fn.Request) -> https_fn.Response:
         if path == '/api/history' and method == 'GET':
             if lotto_history_df.empty:
                 load_lotto_data()
-            return create_response(lotto_history_df.to_dict(orient="records"))
+            if req.args.get('format') == COLUMNAR_FORMAT:
+                return create_response(to_columnar(lotto_history_df), req=req)
+            return create_response(frame_to_records(lotto_history_df), req=req)
         
         # /api/analyze - 빈도 분석 및 추천
         elif path == '/api/analyze' and method == 'GET':
@@ -92,16 +236,91 @@ def lotto_api(req: https_fn.Request) -> https_fn.Response:
                 load_lotto_data()
             
             strategy = req.args.get('strategy')
-            freq = analyze_number_frequency(lotto_history_df)
+            freq = strategy_pools.context.freq if strategy_pools.context else None
             
             if freq is None:
                 return create_response({"error": "분석 실패"}, 500)
             
-            if strategy in ['top20', 'bottom20']:
-                recommended = get_recommended_numbers(freq, strategy)
-                return create_response({"strategy": strategy, "numbers": recommended})
+            # 전략별 추천 (사전 계산된 풀에서 샘플링)
+            if strategy:
+                if get_strategy(strategy) is None:
+                    return create_response({"error": f"알 수 없는 전략입니다: {strategy}"}, 400)
+                return create_response({"strategy": strategy, "numbers": strategy_pools.recommend(strategy)})
+            
+            # 번호별 미출현 간격
+            if req.args.get('view') == 'gaps':
+                return create_response(gap_index.to_dict(), req=req)
+            
+            if req.args.get('format') == COLUMNAR_FORMAT:
+                return create_response(to_columnar(frequency_frame(freq)), req=req)
+            return create_response(freq.to_dict(), req=req)
+        
+        # /api/ticket-history - 티켓의 역대 전 회차 등수 분포
+        elif path == '/api/ticket-history' and method == 'GET':
+            if lotto_history_df.empty:
+                load_lotto_data()
+            
+            try:
+                numbers = parse_ticket(req.args.get('numbers'))
+                return create_response(ticket_index.lookup(numbers))
+            except ValueError as e:
+                return create_response({"error": str(e)}, 400)
+        
+        # /api/strategies - 등록된 추천 전략 목록
+        elif path == '/api/strategies' and method == 'GET':
+            return create_response(available_strategies())
+        
+        # /api/statistics - 당첨 번호 통계 검정
+        elif path == '/api/statistics' and method == 'GET':
+            if lotto_history_df.empty:
+                load_lotto_data()
+            
+            statistics = get_draw_statistics(lotto_history_df)
+            if statistics is None:
+                return create_response({"error": "분석 실패"}, 500)
+            return create_response(statistics, req=req)
+        
+        # /api/transitions - 연속 회차 간 번호 전이 분석
+        elif path == '/api/transitions' and method == 'GET':
+            if lotto_history_df.empty:
+                load_lotto_data()
+            
+            if transition_index.pairs == 0:
+                return create_response({"error": "분석 실패"}, 500)
+            return create_response(transition_index.to_dict(), req=req)
+        
+        # /api/wheel - 후보 풀 커버리지 최대화 티켓 묶음
+        elif path == '/api/wheel' and method == 'GET':
+            if lotto_history_df.empty:
+                load_lotto_data()
+            
+            tickets = req.args.get('tickets', '10')
+            cover = req.args.get('cover', '2')
+            if not tickets.isdigit() or not 1 <= int(tickets) <= MAX_BUDGET:
+                return create_response({"error": f"tickets는 1~{MAX_BUDGET} 사이의 정수여야 합니다"}, 400)
+            if cover not in ('2', '3'):
+                return create_response({"error": "cover는 2 또는 3이어야 합니다"}, 400)
             
-            return create_response(freq.to_dict())
+            pool = req.args.get('pool')
+            strategy = req.args.get('strategy')
+            try:
+                if pool:
+                    numbers = parse_ticket(pool)
+                elif strategy and strategy_pools.pool(strategy) is not None:
+                    numbers = strategy_pools.pool(strategy).candidates.tolist()
+                else:
+                    return create_response({"error": "pool 또는 등록된 strategy가 필요합니다"}, 400)
+                return create_response(generate_portfolio(numbers, int(tickets), int(cover)))
+            except ValueError as e:
+                return create_response({"error": str(e)}, 400)
+        
+        # /api/simulate - 티켓 포트폴리오 몬테카를로 시뮬레이션
+        elif path == '/api/simulate' and method == 'POST':
+            try:
+                params = parse_simulation_request(req.get_json() or {})
+                return create_response(simulate_portfolio(**params))
+            except ValueError as e:
+                return create_response({"error": str(e)}, 400)
         
         # /api/save-selection - 사용자 선택 저장
         elif path == '/api/save-selection' and method == 'POST':
@@ -119,9 +338,50 @@ def lotto_api(req: https_fn.Request) -> https_fn.Response:
             stats_manager.load()
             return create_response(stats_manager.get_stats_summary())
 
+        # /api/ticket-popularity - 이번 주 티켓별 선택 수
+        elif path == '/api/ticket-popularity' and method == 'GET':
+            stats_manager.load()
+            numbers = req.args.get('numbers')
+            if numbers is None:
+                return create_response(stats_manager.get_ticket_popularity())
+            try:
+                ticket = validate_ticket(parse_ticket(numbers))
+            except ValueError as e:
+                return create_response({"error": str(e)}, 400)
+            return create_response(stats_manager.get_ticket_popularity(ticket))
+        
+        # /api/strategy-leaderboard - 전략별 누적 당첨 성적
+        elif path == '/api/strategy-leaderboard' and method == 'GET':
+            return create_response(stats_manager.get_strategy_leaderboard())
+        
+        # /api/weekly-export - 주간 선택/등수 NDJSON 스트리밍
+        elif path == '/api/weekly-export' and method == 'GET':
+            rank = req.args.get('rank')
+            if rank is not None:
+                if not rank.isdigit() or int(rank) > 5:
+                    return create_response({"error": "rank는 0~5 사이의 정수여야 합니다"}, 400)
+                rank = int(rank)
+            
+            # 주차/당첨 결과는 users 없이, 선택은 저장소에서 페이지 단위로 읽음
+            pages = stats_manager.iter_export(
+                week=req.args.get('week'), rank=rank, strategy=req.args.get('strategy')
+            )
+            return https_fn.Response(
+                profiled_stream(iter_ndjson(pages)),
+                mimetype=NDJSON_MEDIA_TYPE,
+                headers={"Access-Control-Allow-Origin": "*"},
+            )
+
         # /api/weekly-history - 주간 통계 히스토리 조회 (NEW)
         elif path == '/api/weekly-history' and method == 'GET':
-            return create_response(stats_manager.get_history())
+            limit = req.args.get('limit', '10')
+            if not limit.isdigit() or not 1 <= int(limit) <= MAX_HISTORY_PAGE_SIZE:
+                return create_response(
+                    {"error": f"limit은 1~{MAX_HISTORY_PAGE_SIZE} 사이의 정수여야 합니다"}, 400
+                )
+            return create_response(
+                stats_manager.get_history(int(limit), req.args.get('start_after'))
+            )
         
         # /api/update - 데이터 업데이트 (수동 트리거용)
         elif path == '/api/update' and method == 'POST':
@@ -149,6 +409,20 @@ def lotto_api(req: https_fn.Request) -> https_fn.Response:
             stats_manager.reset()
             return create_response({"message": "주간 통계가 초기화되었습니다."})
         
+        # /api/admin/profiles - 요청 프로파일 목록/조회 (관리자용)
+        elif path.startswith('/api/admin/profiles') and method == 'GET':
+            if not request_profiler.is_admin(req.headers.get(ADMIN_TOKEN_HEADER)):
+                return create_response({"error": "관리자 권한이 필요합니다"}, 403)
+            
+            profile_id = path[len('/api/admin/profiles'):].strip('/')
+            if not profile_id:
+                return create_response(request_profiler.list_profiles())
+            
+            session = request_profiler.get_profile(profile_id)
+            if session is None:
+                return create_response({"error": "프로파일을 찾을 수 없습니다"}, 404)
+            return https_fn.Response(session.collapsed(), mimetype="text/plain")
+        
         else:
             return create_response({"error": "Endpoint not found"}, 404)
     
@@ -173,33 +447,42 @@ def update_lotto_data_logic() -> dict:
             last_saved_no = int(lotto_history_df['draw_no'].max())
         
         if last_saved_no >= latest_no:
+            if not snapshot_current:
+                # 스냅샷이 없거나 이전 데이터/전략 버전이면 최신 상태로 다시 게시
+                publish_snapshot()
             return {"message": "데이터가 이미 최신 상태입니다."}
         
-        # 새로운 회차 데이터 가져오기
-        new_draws = []
-        for i in range(last_saved_no + 1, latest_no + 1):
-            draw_data = get_lotto_win_numbers(i)
-            if draw_data:
-                new_draws.append(draw_data)
+        # 새로운 회차 데이터 가져오기 (동시 조회)
+        new_draws = fetch_draw_range(last_saved_no + 1, latest_no)
         
+        applied = []
         if new_draws and db:
-            batch = db.batch()
-            collection_ref = db.collection(COLLECTION_LOTTO_HISTORY)
-            
-            for draw_data in new_draws:
-                doc_ref = collection_ref.document(str(draw_data['draw_no']))
-                batch.set(doc_ref, draw_data)
-            
-            batch.commit()
-            load_lotto_data()
+            # 배치 한도 단위로 나누어 커밋
+            written = write_draws(db, new_draws)
             
-            # 당첨자 확인
-            stats_manager.load()
-            stats_manager.check_winners(new_draws[-1])
+            # 조회/저장에 성공한 연속 회차만 반영 (실패한 회차는 다음 실행에서 재시도)
+            applied = consecutive_prefix(new_draws, last_saved_no + 1, written)
+            if applied:
+                append_draws(applied)
+                
+                # 콜드 인스턴스가 회차 문서 전체 대신 읽을 분석 스냅샷 게시
+                publish_snapshot()
+        
+        if len(applied) < latest_no - last_saved_no:
+            failed_no = last_saved_no + len(applied) + 1
+            return {
+                "error": f"업데이트 실패: {failed_no}회 조회 또는 저장 실패 "
+                         f"({len(applied)}개 회차만 반영, 다시 실행하면 {failed_no}회부터 재시도)",
+                "count": len(applied)
+            }
+        
+        # 당첨자 확인
+        stats_manager.load()
+        stats_manager.check_winners(applied[-1])
         
         return {
             "message": f"{last_saved_no + 1}회부터 {latest_no}회까지 업데이트 완료",
-            "count": len(new_draws)
+            "count": len(applied)
         }
     except Exception as e:
         return {"error": f"업데이트 실패: {str(e)}"}
@@ -209,9 +492,13 @@ def update_lotto_data_logic() -> dict:
 @scheduler_fn.on_schedule(
     schedule="0 21 * * 6",  # 매주 토요일 21:00 (KST 기준 아님, UTC 기준 유의 필요. 한국 시간 21시는 UTC 12시)
     timezone=scheduler_fn.Timezone("Asia/Seoul"),
+    # 일부 회차 조회/저장에 실패하면 예외로 끝나므로 스케줄러가 다시 실행
+    retry_config=scheduler_fn.RetryConfig(retry_count=3, min_backoff_seconds=600),
 )
 def scheduled_lotto_update(event: scheduler_fn.ScheduledEvent) -> None:
     """자동 업데이트 스케줄러"""
     print(f"자동 업데이트 시작: {event.schedule_time}")
     result = update_lotto_data_logic()
     print(f"자동 업데이트 결과: {json.dumps(result, ensure_ascii=False)}")
+    if "error" in result:
+        raise RuntimeError(result["error"])
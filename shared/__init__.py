@@ -5,9 +5,31 @@ Contains common logic used by both backend and Firebase functions.
 
 from .constants import *
 from .lotto_api import get_lotto_win_numbers, get_latest_draw_number
-from .analysis import analyze_number_frequency, get_recommended_numbers
+from .analysis import analyze_number_frequency, get_recommended_numbers, GapIndex, TransitionIndex
+from .draw_statistics import get_draw_statistics
+from .ticket_index import TicketHistoryIndex
+from .strategies import (
+    RecommendationStrategy,
+    FrequencyStrategy,
+    StrategyPool,
+    StrategyPools,
+    register_strategy,
+    available_strategies,
+)
+from .draw_calendar import (
+    draw_datetime,
+    draw_number_at,
+    predict_latest_draw_number,
+    current_week_key,
+)
 from .weekly_stats import get_current_week, calculate_prize_rank, WeeklyStatsManager
 from .firebase_client import get_firestore_client, initialize_firebase
+from .storage import (
+    WeeklyStatsStorage,
+    FirestoreStatsStorage,
+    MemoryStatsStorage,
+    SQLiteStatsStorage,
+)
 
 __all__ = [
     # Constants
@@ -22,13 +44,34 @@ __all__ = [
     # Lotto API
     "get_lotto_win_numbers",
     "get_latest_draw_number",
+    # Draw Calendar
+    "draw_datetime",
+    "draw_number_at",
+    "predict_latest_draw_number",
+    "current_week_key",
     # Analysis
     "analyze_number_frequency",
     "get_recommended_numbers",
+    "GapIndex",
+    "TransitionIndex",
+    "get_draw_statistics",
+    "TicketHistoryIndex",
+    # Strategies
+    "RecommendationStrategy",
+    "FrequencyStrategy",
+    "StrategyPool",
+    "StrategyPools",
+    "register_strategy",
+    "available_strategies",
     # Weekly Stats
     "get_current_week",
     "calculate_prize_rank",
     "WeeklyStatsManager",
+    # Storage
+    "WeeklyStatsStorage",
+    "FirestoreStatsStorage",
+    "MemoryStatsStorage",
+    "SQLiteStatsStorage",
     # Firebase
     "get_firestore_client",
     "initialize_firebase",
@@ -3,10 +3,17 @@
 빈도 분석 및 번호 추천 로직
 """
 
+import math
 from typing import Optional
 import pandas as pd
 import numpy as np
 
+# 당첨 번호 컬럼 (보너스 제외)
+WIN_COLUMNS = ["num1", "num2", "num3", "num4", "num5", "num6"]
+
+# 로또 번호 범위
+MAX_NUMBER = 45
+
 
 def analyze_number_frequency(df: pd.DataFrame) -> Optional[pd.Series]:
     """
@@ -22,41 +29,338 @@ def analyze_number_frequency(df: pd.DataFrame) -> Optional[pd.Series]:
         return None
 
     try:
-        win_numbers_only = df[["num1", "num2", "num3", "num4", "num5", "num6"]]
+        win_numbers_only = df[WIN_COLUMNS]
         all_numbers = win_numbers_only.values.flatten()
         return pd.Series(all_numbers).value_counts()
     except KeyError:
         return None
 
 
+def get_draw_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    DataFrame에서 회차순 당첨 번호 행렬을 추출합니다.
+
+    Args:
+        df: 로또 당첨 번호 DataFrame (draw_no, num1~num6 컬럼 필요)
+
+    Returns:
+        (회차 수 x 6) 정수 행렬 (draw_no 오름차순)
+    """
+    if df.empty:
+        return np.empty((0, 6), dtype=np.int64)
+    ordered = df.sort_values("draw_no") if "draw_no" in df else df
+    return ordered[WIN_COLUMNS].to_numpy(dtype=np.int64)
+
+
+def get_data_version(df: pd.DataFrame) -> str:
+    """
+    히스토리 데이터의 버전 키를 반환합니다.
+    회차는 추가만 되므로 (회차 수, 최신 회차)로 변경 여부를 판별합니다.
+
+    Args:
+        df: 로또 당첨 번호 DataFrame
+
+    Returns:
+        "회차수-최신회차" 형식의 문자열 (빈 데이터면 "0-0")
+    """
+    if df.empty or "draw_no" not in df:
+        return "0-0"
+    return f"{len(df)}-{int(df['draw_no'].max())}"
+
+
+class GapIndex:
+    """
+    번호별 미출현 간격(gap) 인덱스.
+
+    번호마다 마지막 출현 회차, 완료된 간격의 합/개수/최댓값을 보관하여
+    새 회차가 추가될 때 전체 히스토리를 다시 훑지 않고 갱신합니다.
+    """
+
+    def __init__(self):
+        size = MAX_NUMBER + 1
+        self.latest_draw = 0
+        self.last_seen = np.zeros(size, dtype=np.int64)
+        self.gap_sum = np.zeros(size, dtype=np.int64)
+        self.gap_count = np.zeros(size, dtype=np.int64)
+        self.max_gap = np.zeros(size, dtype=np.int64)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "GapIndex":
+        """
+        전체 히스토리로 인덱스를 생성합니다.
+
+        Args:
+            df: 로또 당첨 번호 DataFrame (draw_no, num1~num6 컬럼 필요)
+
+        Returns:
+            GapIndex
+        """
+        index = cls()
+        if df.empty:
+            return index
+
+        ordered = df.sort_values("draw_no")
+        draw_nos = ordered["draw_no"].to_numpy(dtype=np.int64)
+        matrix = ordered[WIN_COLUMNS].to_numpy(dtype=np.int64)
+
+        # (회차 x 번호) 출현 여부 행렬
+        hits = np.zeros((len(draw_nos), MAX_NUMBER + 1), dtype=bool)
+        hits[np.arange(len(draw_nos))[:, None], matrix] = True
+
+        index.latest_draw = int(draw_nos[-1])
+        for number in range(1, MAX_NUMBER + 1):
+            seen = draw_nos[hits[:, number]]
+            if seen.size == 0:
+                continue
+            gaps = np.diff(seen)
+            index.last_seen[number] = seen[-1]
+            index.gap_sum[number] = gaps.sum()
+            index.gap_count[number] = gaps.size
+            index.max_gap[number] = gaps.max() if gaps.size else 0
+        return index
+
+    def update(self, draw: dict) -> bool:
+        """
+        새 회차 1건을 반영합니다.
+
+        Args:
+            draw: draw_no, num1~num6 키를 가진 추첨 결과
+
+        Returns:
+            반영 여부 (이미 반영된 회차면 False)
+        """
+        draw_no = int(draw["draw_no"])
+        if draw_no <= self.latest_draw:
+            return False
+
+        for column in WIN_COLUMNS:
+            number = int(draw[column])
+            previous = self.last_seen[number]
+            if previous:
+                gap = draw_no - previous
+                self.gap_sum[number] += gap
+                self.gap_count[number] += 1
+                self.max_gap[number] = max(self.max_gap[number], gap)
+            self.last_seen[number] = draw_no
+
+        self.latest_draw = draw_no
+        return True
+
+    def current_gaps(self) -> np.ndarray:
+        """번호별 마지막 출현 이후 지난 회차 수 (인덱스 = 번호)"""
+        gaps = self.latest_draw - self.last_seen
+        gaps[0] = 0
+        return gaps
+
+    def overdue_numbers(self, count: int = 20) -> list[int]:
+        """
+        현재 간격이 긴 순서로 번호를 반환합니다.
+
+        Args:
+            count: 반환할 번호 개수
+
+        Returns:
+            오래 나오지 않은 번호 리스트
+        """
+        gaps = self.current_gaps()[1:]
+        # 간격 내림차순, 같으면 번호 오름차순
+        order = np.lexsort((np.arange(1, MAX_NUMBER + 1), -gaps))
+        return (order[:count] + 1).tolist()
+
+    def to_dict(self) -> dict[int, dict]:
+        """번호별 last_seen/current_gap/max_gap/mean_gap 딕셔너리를 반환합니다."""
+        current = self.current_gaps()
+        result = {}
+        for number in range(1, MAX_NUMBER + 1):
+            count = int(self.gap_count[number])
+            result[number] = {
+                "last_seen": int(self.last_seen[number]),
+                "current_gap": int(current[number]),
+                "max_gap": int(max(self.max_gap[number], current[number])),
+                "mean_gap": round(float(self.gap_sum[number]) / count, 2) if count else None,
+            }
+        return result
+
+
+class TransitionIndex:
+    """
+    연속 회차 간 번호 전이 인덱스.
+
+    counts[i, j]는 i가 나온 회차의 바로 다음 회차에 j가 나온 횟수이며,
+    (회차 x 번호) 출현 행렬의 연속 행 외적 합(H[:-1].T @ H[1:])으로 한 번에
+    계산합니다. 새 회차는 직전 회차 출현 벡터와의 외적 1회로 반영합니다.
+    회차 번호가 1 차이 나는 쌍만 집계하므로, 빠진 회차가 있으면 그 앞뒤는
+    연속 쌍으로 세지 않습니다.
+    """
+
+    def __init__(self):
+        size = MAX_NUMBER + 1
+        self.latest_draw = 0
+        self.counts = np.zeros((size, size), dtype=np.int64)
+        # 다음 회차가 있는 회차에서 번호별 출현 횟수 (조건부 확률의 분모)
+        self.appearances = np.zeros(size, dtype=np.int64)
+        # 연속 두 회차가 공유한 번호 개수 분포 (0~6개)
+        self.carry_over = np.zeros(len(WIN_COLUMNS) + 1, dtype=np.int64)
+        self.last_hits = np.zeros(size, dtype=np.int64)
+
+    @property
+    def pairs(self) -> int:
+        """집계된 연속 회차 쌍의 수"""
+        return int(self.carry_over.sum())
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "TransitionIndex":
+        """
+        전체 히스토리로 인덱스를 생성합니다.
+
+        Args:
+            df: 로또 당첨 번호 DataFrame (draw_no, num1~num6 컬럼 필요)
+
+        Returns:
+            TransitionIndex
+        """
+        index = cls()
+        if df.empty:
+            return index
+
+        matrix = get_draw_matrix(df)
+        hits = np.zeros((len(matrix), MAX_NUMBER + 1), dtype=np.int64)
+        hits[np.arange(len(matrix))[:, None], matrix] = 1
+
+        # 회차 번호가 이어지는 쌍만 사용 (빠진 회차 앞뒤는 제외)
+        consecutive = np.diff(np.sort(df["draw_no"].to_numpy(dtype=np.int64))) == 1
+        previous, following = hits[:-1][consecutive], hits[1:][consecutive]
+        index.counts = previous.T @ following
+        index.appearances = previous.sum(axis=0)
+        index.carry_over = np.bincount(
+            (previous & following).sum(axis=1), minlength=len(WIN_COLUMNS) + 1
+        )
+        index.last_hits = hits[-1].copy()
+        index.latest_draw = int(df["draw_no"].max())
+        return index
+
+    def update(self, draw: dict) -> bool:
+        """
+        새 회차 1건을 반영합니다.
+
+        Args:
+            draw: draw_no, num1~num6 키를 가진 추첨 결과
+
+        Returns:
+            반영 여부 (이미 반영된 회차면 False)
+        """
+        draw_no = int(draw["draw_no"])
+        if draw_no <= self.latest_draw:
+            return False
+
+        hits = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+        hits[[int(draw[column]) for column in WIN_COLUMNS]] = 1
+        # 바로 다음 회차일 때만 쌍으로 집계 (건너뛴 회차가 있으면 from_history와 같이 제외)
+        if self.latest_draw and draw_no == self.latest_draw + 1:
+            self.counts += np.outer(self.last_hits, hits)
+            self.appearances += self.last_hits
+            self.carry_over[int((self.last_hits & hits).sum())] += 1
+
+        self.last_hits = hits
+        self.latest_draw = draw_no
+        return True
+
+    def conditional_matrix(self) -> np.ndarray:
+        """P(다음 회차에 j | 이번 회차에 i) 행렬 (인덱스 = 번호, 0행/0열은 사용하지 않음)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix = self.counts / self.appearances[:, None]
+        return np.nan_to_num(matrix)
+
+    def next_draw_scores(self) -> np.ndarray:
+        """최신 회차 번호들의 조건부 확률 합 (번호별 다음 회차 출현 점수)"""
+        return self.last_hits @ self.conditional_matrix()
+
+    def likely_numbers(self, count: int = 20) -> list[int]:
+        """
+        최신 회차 다음에 나올 조건부 점수가 높은 순서로 번호를 반환합니다.
+
+        Args:
+            count: 반환할 번호 개수
+
+        Returns:
+            번호 리스트
+        """
+        scores = self.next_draw_scores()[1:]
+        # 점수 내림차순, 같으면 번호 오름차순
+        order = np.lexsort((np.arange(1, MAX_NUMBER + 1), -scores))
+        return (order[:count] + 1).tolist()
+
+    def to_dict(self) -> dict:
+        """반복 출현/이월 개수 분포/조건부 행렬/다음 회차 점수를 반환합니다."""
+        picks = len(WIN_COLUMNS)
+        total = math.comb(MAX_NUMBER, picks)
+        # 독립 추첨일 때 두 회차가 k개를 공유할 확률 (초기하분포)
+        expected = [
+            math.comb(picks, k) * math.comb(MAX_NUMBER - picks, picks - k) / total * self.pairs
+            for k in range(picks + 1)
+        ]
+        conditional = self.conditional_matrix()
+        scores = self.next_draw_scores()
+        repeats = np.diag(self.counts)
+        return {
+            "latest_draw": self.latest_draw,
+            "pairs": self.pairs,
+            "carry_over": {
+                "observed": {k: int(v) for k, v in enumerate(self.carry_over)},
+                "expected": {k: round(v, 2) for k, v in enumerate(expected)},
+                "mean": round(float(np.arange(picks + 1) @ self.carry_over) / self.pairs, 4)
+                if self.pairs
+                else None,
+            },
+            "repeats": {
+                number: {
+                    "count": int(repeats[number]),
+                    "rate": round(float(conditional[number, number]), 4),
+                }
+                for number in range(1, MAX_NUMBER + 1)
+            },
+            "conditional": np.round(conditional[1:, 1:], 4).tolist(),
+            "next_draw_scores": {
+                number: round(float(scores[number]), 4) for number in range(1, MAX_NUMBER + 1)
+            },
+        }
+
+
 def get_recommended_numbers(
-    freq: pd.Series, strategy: str, count: int = 6
+    freq: pd.Series,
+    strategy: str,
+    count: int = 6,
+    gap_index: Optional[GapIndex] = None,
+    transition_index: Optional[TransitionIndex] = None,
 ) -> list[int]:
     """
     전략에 따라 추천 번호를 생성합니다.
+    빈도 전략은 freq에서 바로 뽑고, 그 밖의 전략은 호출마다 후보 풀을 새로 만들므로
+    반복 요청에는 strategies.StrategyPools를 사용합니다.
 
     Args:
         freq: 번호별 빈도 Series
-        strategy: 'top20' (자주 나온 번호) 또는 'bottom20' (적게 나온 번호)
+        strategy: 등록된 전략 이름 ('top20', 'bottom20', 'overdue' 등)
         count: 추천할 번호 개수 (기본 6개)
+        gap_index: 번호별 미출현 간격 인덱스 ('overdue' 전략에 필요)
+        transition_index: 연속 회차 전이 인덱스 ('transition' 전략에 필요)
 
     Returns:
-        정렬된 추천 번호 리스트
+        정렬된 추천 번호 리스트 (등록되지 않은 전략이면 빈 리스트)
     """
-    if freq is None or freq.empty:
-        return []
+    from .strategies import AnalysisContext, FrequencyStrategy, get_strategy
 
-    if strategy == "top20":
-        # 가장 많이 나온 상위 20개 번호에서 선택
-        candidate_numbers = freq.head(20).index.tolist()
-    elif strategy == "bottom20":
-        # 가장 적게 나온 하위 20개 번호에서 선택
-        candidate_numbers = freq.tail(20).index.tolist()
-    else:
+    strategy_impl = get_strategy(strategy)
+    if strategy_impl is None:
         return []
+    if isinstance(strategy_impl, FrequencyStrategy):
+        # 빈도만 쓰는 전략은 분석 컨텍스트(빈 히스토리, 인덱스) 없이 바로 샘플링
+        return strategy_impl.pool_from_frequency(freq).sample(count)
 
-    # 랜덤하게 count개 선택
-    selected = np.random.choice(
-        candidate_numbers, size=min(count, len(candidate_numbers)), replace=False
+    context = AnalysisContext(
+        pd.DataFrame(),
+        freq=freq,
+        gap_index=gap_index or GapIndex(),
+        transition_index=transition_index or TransitionIndex(),
     )
-    return sorted(selected.tolist())
+    return strategy_impl.build_pool(context).sample(count)
@@ -0,0 +1,320 @@
+"""
+로또 당첨번호 백필 모듈
+회차 범위를 동시에 가져와 체크포인트 파일에 기록하고, Firestore에는
+배치 한도 이하로 나눈 배치를 병렬 커밋하며, CSV 백업과 분석 스냅샷을 함께 갱신합니다.
+
+사용법 (저장소 루트에서 실행):
+    python -m shared.backfill --csv backend/lotto_history.csv --csv functions/lotto_history.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Optional
+
+import pandas as pd
+
+from .constants import COLLECTION_LOTTO_HISTORY, FIRESTORE_BATCH_LIMIT
+from .lotto_api import (
+    DEFAULT_FETCH_WORKERS,
+    LottoDrawResult,
+    fetch_draws,
+    get_latest_draw_number,
+)
+from .snapshot import AnalysisSnapshot
+
+DRAW_COLUMNS = ["draw_no", "num1", "num2", "num3", "num4", "num5", "num6", "bonus"]
+
+DEFAULT_CHECKPOINT = "backfill_checkpoint.json"
+
+# 이 회차 수만큼 가져올 때마다 체크포인트를 저장
+FETCH_CHUNK_SIZE = 100
+
+DEFAULT_WRITE_WORKERS = 4
+
+
+def write_draws(
+    db: Any,
+    draws: list[LottoDrawResult],
+    batch_size: int = FIRESTORE_BATCH_LIMIT,
+    workers: int = DEFAULT_WRITE_WORKERS,
+    on_commit: Optional[Callable[[list[int]], None]] = None,
+) -> list[int]:
+    """
+    회차 데이터를 Firestore 배치 한도 이하의 배치로 나누어 병렬 커밋합니다.
+    실패한 배치는 건너뛰므로 이미 커밋된 배치는 유지됩니다.
+
+    Args:
+        db: Firestore 클라이언트
+        draws: 저장할 회차 데이터
+        batch_size: 배치당 쓰기 수 (최대 FIRESTORE_BATCH_LIMIT)
+        workers: 동시에 커밋할 배치 수
+        on_commit: 배치 커밋 성공 시 해당 회차 번호 목록으로 호출
+
+    Returns:
+        커밋된 회차 번호 리스트
+    """
+    if not draws:
+        return []
+
+    batch_size = max(1, min(batch_size, FIRESTORE_BATCH_LIMIT))
+    chunks = [draws[i : i + batch_size] for i in range(0, len(draws), batch_size)]
+    collection_ref = db.collection(COLLECTION_LOTTO_HISTORY)
+
+    def commit(chunk: list[LottoDrawResult]) -> list[int]:
+        batch = db.batch()
+        for draw_data in chunk:
+            batch.set(collection_ref.document(str(draw_data["draw_no"])), draw_data)
+        batch.commit()
+        return [int(draw_data["draw_no"]) for draw_data in chunk]
+
+    committed = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+        futures = {executor.submit(commit, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                draw_nos = future.result()
+            except Exception as e:
+                print(
+                    f"Firestore 배치 저장 실패 ({chunk[0]['draw_no']}~{chunk[-1]['draw_no']}회): {e}"
+                )
+                continue
+            committed.extend(draw_nos)
+            if on_commit:
+                on_commit(draw_nos)
+    return sorted(committed)
+
+
+def consecutive_prefix(
+    draws: list[LottoDrawResult], start_no: int, written: Optional[Iterable[int]] = None
+) -> list[LottoDrawResult]:
+    """
+    start_no부터 빠짐없이 이어지는 앞부분 회차만 반환합니다.
+    조회나 저장에 실패한 회차 뒤는 반영하지 않아야 다음 실행이 그 회차부터 다시 시도합니다.
+
+    Args:
+        draws: 회차 오름차순 데이터 (가져오지 못한 회차는 빠져 있을 수 있음)
+        start_no: 기대하는 첫 회차
+        written: 저장에 성공한 회차 번호 (None이면 저장 여부를 따지지 않음)
+
+    Returns:
+        연속된 회차 데이터
+    """
+    written = set(written) if written is not None else None
+    prefix = []
+    for draw_data in draws:
+        draw_no = int(draw_data["draw_no"])
+        if draw_no != start_no + len(prefix) or (written is not None and draw_no not in written):
+            break
+        prefix.append(draw_data)
+    return prefix
+
+
+class BackfillCheckpoint:
+    """
+    백필 진행 상태 파일.
+
+    가져온 회차 데이터와 Firestore에 커밋된 회차 번호를 기록하므로,
+    중단 후 다시 실행하면 남은 회차만 가져오고 남은 배치만 저장합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.draws: dict[int, LottoDrawResult] = {}
+        self.written: set[int] = set()
+
+    @classmethod
+    def load(cls, path: str) -> "BackfillCheckpoint":
+        """체크포인트 파일을 읽습니다. 없거나 손상되었으면 빈 상태로 시작합니다."""
+        checkpoint = cls(path)
+        if not os.path.exists(path):
+            return checkpoint
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            checkpoint.draws = {int(draw["draw_no"]): draw for draw in data.get("draws", [])}
+            checkpoint.written = set(data.get("written", []))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"체크포인트 로드 실패, 처음부터 시작합니다: {e}")
+        return checkpoint
+
+    def save(self) -> None:
+        """임시 파일에 쓴 뒤 교체하여 중단되어도 파일이 깨지지 않게 저장합니다."""
+        data = {
+            "draws": [self.draws[draw_no] for draw_no in sorted(self.draws)],
+            "written": sorted(self.written),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def missing(self, start_no: int, end_no: int) -> list[int]:
+        """범위 내에서 아직 가져오지 못한 회차 번호"""
+        return [n for n in range(start_no, end_no + 1) if n not in self.draws]
+
+    def unwritten(self, start_no: int, end_no: int) -> list[LottoDrawResult]:
+        """범위 내에서 가져왔지만 Firestore에 커밋되지 않은 회차 데이터"""
+        return [
+            self.draws[n]
+            for n in range(start_no, end_no + 1)
+            if n in self.draws and n not in self.written
+        ]
+
+
+def refresh_csv(path: str, draws: list[LottoDrawResult]) -> int:
+    """
+    CSV 백업에 회차 데이터를 병합합니다 (같은 회차는 새 데이터로 대체).
+
+    Args:
+        path: CSV 파일 경로
+        draws: 병합할 회차 데이터
+
+    Returns:
+        저장된 전체 회차 수
+    """
+    frames = [pd.DataFrame(draws, columns=DRAW_COLUMNS)]
+    if os.path.exists(path):
+        frames.insert(0, pd.read_csv(path)[DRAW_COLUMNS])
+
+    merged = (
+        pd.concat(frames, ignore_index=True)
+        .drop_duplicates("draw_no", keep="last")
+        .sort_values("draw_no")
+        .astype(int)
+    )
+    tmp_path = f"{path}.tmp"
+    # 기존 파일과 같이 BOM 포함 UTF-8로 저장
+    merged.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+    os.replace(tmp_path, path)
+    return len(merged)
+
+
+def run_backfill(
+    db: Any,
+    start_no: int = 1,
+    end_no: Optional[int] = None,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    csv_paths: tuple[str, ...] = (),
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+    rewrite: bool = False,
+) -> dict:
+    """
+    회차 범위를 백필합니다.
+
+    Args:
+        db: Firestore 클라이언트 (None이면 Firestore 저장 생략)
+        start_no: 시작 회차
+        end_no: 끝 회차 (None이면 최신 회차)
+        checkpoint_path: 체크포인트 파일 경로
+        csv_paths: 갱신할 CSV 백업 경로
+        fetch_workers: 동시 조회 수
+        write_workers: 동시에 커밋할 배치 수
+        chunk_size: 체크포인트 저장 단위 (회차 수)
+        rewrite: 체크포인트의 커밋 기록을 무시하고 모두 다시 저장 (새 프로젝트용)
+
+    Returns:
+        진행 결과 딕셔너리 (가져오지 못한 회차는 missing)
+    """
+    if end_no is None:
+        end_no = get_latest_draw_number()
+        if end_no is None:
+            return {"error": "최신 회차 정보를 가져올 수 없습니다"}
+
+    checkpoint = BackfillCheckpoint.load(checkpoint_path)
+    if rewrite:
+        checkpoint.written.clear()
+
+    pending = checkpoint.missing(start_no, end_no)
+    print(f"{start_no}~{end_no}회 백필: 조회 대상 {len(pending)}개 회차")
+    for i in range(0, len(pending), chunk_size):
+        for draw_data in fetch_draws(pending[i : i + chunk_size], fetch_workers):
+            checkpoint.draws[int(draw_data["draw_no"])] = draw_data
+        checkpoint.save()
+        print(f"  조회 진행: {min(i + chunk_size, len(pending))}/{len(pending)}")
+
+    written = []
+    if db:
+        unwritten = checkpoint.unwritten(start_no, end_no)
+
+        def on_commit(draw_nos: list[int]) -> None:
+            checkpoint.written.update(draw_nos)
+            checkpoint.save()
+
+        written = write_draws(db, unwritten, workers=write_workers, on_commit=on_commit)
+        print(f"  Firestore 저장: {len(written)}/{len(unwritten)}개 회차")
+
+    draws = [checkpoint.draws[n] for n in sorted(checkpoint.draws)]
+    csv_rows = {}
+    for path in csv_paths:
+        try:
+            csv_rows[path] = refresh_csv(path, draws)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"CSV 갱신 실패 ({path}): {e}")
+
+    # 1회차부터 모두 저장되었으면 인스턴스가 시작 시 읽을 분석 스냅샷도 갱신
+    snapshot = None
+    if db and not checkpoint.missing(1, end_no) and not checkpoint.unwritten(1, end_no):
+        history = pd.DataFrame([checkpoint.draws[n] for n in range(1, end_no + 1)])
+        published = AnalysisSnapshot.from_history(history)
+        if published.publish(db):
+            snapshot = published.version
+
+    missing = checkpoint.missing(start_no, end_no)
+    unwritten_count = len(checkpoint.unwritten(start_no, end_no)) if db else 0
+    return {
+        "start_no": start_no,
+        "end_no": end_no,
+        "fetched": len(pending) - len(missing),
+        "missing": missing,
+        "written": len(written),
+        "unwritten": unwritten_count,
+        "csv": csv_rows,
+        "snapshot": snapshot,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="로또 당첨번호 백필")
+    parser.add_argument("--start", type=int, default=1, help="시작 회차")
+    parser.add_argument("--end", type=int, default=None, help="끝 회차 (기본: 최신 회차)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--csv", action="append", default=[], help="갱신할 CSV 경로 (반복 가능)")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_WRITE_WORKERS)
+    parser.add_argument("--no-firestore", action="store_true", help="Firestore 저장 생략")
+    parser.add_argument("--rewrite", action="store_true", help="커밋 기록을 무시하고 모두 다시 저장")
+    args = parser.parse_args(argv)
+
+    db = None
+    if not args.no_firestore:
+        from .firebase_client import get_firestore_client
+
+        db = get_firestore_client()
+        if db is None:
+            print("Firestore에 연결할 수 없습니다 (--no-firestore로 CSV만 갱신 가능)")
+            return 1
+
+    result = run_backfill(
+        db,
+        start_no=args.start,
+        end_no=args.end,
+        checkpoint_path=args.checkpoint,
+        csv_paths=tuple(args.csv),
+        fetch_workers=args.fetch_workers,
+        write_workers=args.write_workers,
+        rewrite=args.rewrite,
+    )
+    print(json.dumps(result, ensure_ascii=False))
+    if result.get("error") or result["missing"] or result["unwritten"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,11 +13,34 @@ COLLECTION_LOTTO_HISTORY = "lotto_history"
 COLLECTION_WEEKLY_STATS = "weekly_stats"
 COLLECTION_WEEKLY_HISTORY = "weekly_history"
 
+# 주차별 사용자 선택 문서 (weekly_selections/{주차}/selections/{selection_id})
+COLLECTION_WEEKLY_SELECTIONS = "weekly_selections"
+SUBCOLLECTION_SELECTIONS = "selections"
+
+# 전략별 누적 성적 문서 ID (weekly_stats 컬렉션)
+DOC_STRATEGY_AGGREGATES = "strategy_aggregates"
+
+# 사전 계산된 분석 스냅샷 문서 (업데이트 파이프라인이 게시)
+COLLECTION_ANALYSIS_SNAPSHOT = "analysis_snapshot"
+DOC_ANALYSIS_SNAPSHOT = "latest"
+
+# 주간 히스토리 페이지 최대 크기
+MAX_HISTORY_PAGE_SIZE = 50
+
+# Firestore 배치당 최대 쓰기 수
+FIRESTORE_BATCH_LIMIT = 500
+
 # 로또 추첨 시간 설정 (토요일 오후 8시 45분)
 DRAW_DAY = 5  # 토요일 (0=월요일, 6=일요일)
 DRAW_HOUR = 20
 DRAW_MINUTE = 45
 
+# 1회차 추첨일 (이후 매주 같은 요일/시각에 추첨)
+FIRST_DRAW_DATE = (2002, 12, 7)
+
+# 추첨 시각 기준 시간대 (한국 표준시, UTC+9)
+DRAW_UTC_OFFSET_HOURS = 9
+
 # API 타임아웃 설정
 DEFAULT_TIMEOUT = 10
 
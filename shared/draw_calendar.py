@@ -0,0 +1,130 @@
+"""
+추첨 일정 모듈
+매주 고정된 추첨 일정(DRAW_DAY/DRAW_HOUR/DRAW_MINUTE)으로 회차 ↔ 추첨 시각을 계산
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .constants import (
+    DRAW_DAY,
+    DRAW_HOUR,
+    DRAW_MINUTE,
+    DRAW_UTC_OFFSET_HOURS,
+    FIRST_DRAW_DATE,
+)
+
+DRAW_TZ = timezone(timedelta(hours=DRAW_UTC_OFFSET_HOURS))
+DRAW_INTERVAL = timedelta(weeks=1)
+
+FIRST_DRAW_AT = datetime(
+    *FIRST_DRAW_DATE, hour=DRAW_HOUR, minute=DRAW_MINUTE, tzinfo=DRAW_TZ
+)
+
+_week_cache_lock = threading.Lock()
+_week_cache: Optional[tuple[str, datetime, datetime]] = None
+
+
+def now_kst() -> datetime:
+    """추첨 시간대 기준 현재 시각을 반환합니다."""
+    return datetime.now(DRAW_TZ)
+
+
+def _to_draw_tz(moment: Optional[datetime]) -> datetime:
+    if moment is None:
+        return now_kst()
+    if moment.tzinfo is None:
+        # 시간대 정보가 없으면 추첨 시간대 기준 시각으로 간주
+        return moment.replace(tzinfo=DRAW_TZ)
+    return moment.astimezone(DRAW_TZ)
+
+
+def draw_datetime(draw_no: int) -> datetime:
+    """
+    회차의 추첨 시각을 반환합니다.
+
+    Args:
+        draw_no: 회차 번호 (1 이상)
+
+    Returns:
+        추첨 시간대 기준 추첨 시각
+    """
+    return FIRST_DRAW_AT + DRAW_INTERVAL * (draw_no - 1)
+
+
+def draw_number_at(moment: Optional[datetime] = None) -> int:
+    """
+    주어진 시각까지 추첨이 끝난 최신 회차를 일정으로 계산합니다.
+
+    Args:
+        moment: 기준 시각 (None이면 현재, 시간대 없으면 추첨 시간대로 간주)
+
+    Returns:
+        최신 회차 번호 (1회차 이전이면 0)
+    """
+    elapsed = _to_draw_tz(moment) - FIRST_DRAW_AT
+    if elapsed < timedelta(0):
+        return 0
+    return elapsed // DRAW_INTERVAL + 1
+
+
+def predict_latest_draw_number(moment: Optional[datetime] = None) -> int:
+    """네트워크 없이 예측한 최신 회차 번호를 반환합니다."""
+    return draw_number_at(moment)
+
+
+def week_boundaries(moment: Optional[datetime] = None) -> tuple[datetime, datetime]:
+    """
+    기준 시각이 속한 통계 주간의 시작/끝(다음 추첨 시각)을 반환합니다.
+
+    Args:
+        moment: 기준 시각 (None이면 현재)
+
+    Returns:
+        (직전 추첨 시각, 다음 추첨 시각) 튜플
+    """
+    moment = _to_draw_tz(moment)
+    this_week_draw = moment.replace(
+        hour=DRAW_HOUR, minute=DRAW_MINUTE, second=0, microsecond=0
+    ) + timedelta(days=(DRAW_DAY - moment.weekday()) % 7)
+
+    # 이번 주 추첨 시각 이전이면 지난주 추첨부터가 현재 주간
+    if moment < this_week_draw:
+        return this_week_draw - DRAW_INTERVAL, this_week_draw
+    return this_week_draw, this_week_draw + DRAW_INTERVAL
+
+
+def week_key(moment: Optional[datetime] = None) -> str:
+    """
+    통계 주차 키를 계산합니다 (캐시 없음).
+
+    Args:
+        moment: 기준 시각 (None이면 현재)
+
+    Returns:
+        "연도-주차번호" 형식의 문자열 (예: "2024-52")
+    """
+    reference_draw, _ = week_boundaries(moment)
+
+    # 해당 추첨일이 속한 주의 월요일을 기준으로 주차 계산
+    monday_of_week = reference_draw - timedelta(days=DRAW_DAY)
+    return f"{monday_of_week.year}-{monday_of_week.strftime('%U')}"
+
+
+def current_week_key() -> str:
+    """
+    현재 통계 주차 키를 반환합니다.
+    다음 추첨 시각(주차 경계)까지는 계산 결과를 재사용합니다.
+    """
+    global _week_cache
+
+    now = now_kst()
+    cache = _week_cache
+    if cache is not None and cache[1] <= now < cache[2]:
+        return cache[0]
+
+    with _week_cache_lock:
+        start, end = week_boundaries(now)
+        _week_cache = (week_key(now), start, end)
+        return _week_cache[0]
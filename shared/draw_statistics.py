@@ -0,0 +1,244 @@
+"""
+당첨 번호 통계 검정 모듈
+NumPy 당첨 번호 행렬 위에서 균등성/런/연속번호/홀짝/합계 분포를 한 번에 계산
+"""
+
+import math
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .analysis import MAX_NUMBER, get_data_version, get_draw_matrix
+
+PICK_COUNT = 6
+
+# 유의수준
+ALPHA = 0.05
+
+# 합계 분포 구간 폭 (최소 합 21, 최대 합 255)
+SUM_BIN_WIDTH = 20
+
+_cache_lock = threading.Lock()
+_cache: dict[str, dict] = {}
+
+
+def _regularized_gamma_q(a: float, x: float) -> float:
+    """상부 정규화 불완전 감마 함수 Q(a, x) (카이제곱 p-value 계산용)"""
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+
+    if x < a + 1:
+        # 급수 전개로 P(a, x)를 계산 후 1 - P
+        term = total = 1.0 / a
+        denom = a
+        for _ in range(500):
+            denom += 1
+            term *= x / denom
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    # 연분수 전개 (Lentz 방법)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi_square_p_value(statistic: float, dof: int) -> float:
+    """카이제곱 통계량의 상단 꼬리 확률을 반환합니다."""
+    return _regularized_gamma_q(dof / 2, statistic / 2)
+
+
+def _normal_two_sided_p(z: np.ndarray) -> np.ndarray:
+    return np.array([math.erfc(abs(value) / math.sqrt(2)) for value in z])
+
+
+def _hits_matrix(matrix: np.ndarray) -> np.ndarray:
+    """(회차 x 번호) 출현 여부 행렬 (열 0은 사용하지 않음)"""
+    hits = np.zeros((len(matrix), MAX_NUMBER + 1), dtype=bool)
+    hits[np.arange(len(matrix))[:, None], matrix] = True
+    return hits
+
+
+def _uniformity_test(hits: np.ndarray) -> dict:
+    draws = len(hits)
+    observed = hits[:, 1:].sum(axis=0)
+    expected = draws * PICK_COUNT / MAX_NUMBER
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    dof = MAX_NUMBER - 1
+    p_value = chi_square_p_value(statistic, dof)
+    return {
+        "statistic": round(statistic, 4),
+        "dof": dof,
+        "p_value": round(p_value, 6),
+        "expected_count": round(expected, 4),
+        "observed": {number: int(count) for number, count in enumerate(observed, 1)},
+        "uniform": p_value >= ALPHA,
+    }
+
+
+def _runs_test(hits: np.ndarray) -> dict:
+    """번호별 출현/미출현 시퀀스에 대한 Wald-Wolfowitz 런 검정"""
+    sequence = hits[:, 1:]
+    n = len(sequence)
+    n1 = sequence.sum(axis=0).astype(np.float64)
+    n2 = n - n1
+    runs = 1 + (sequence[1:] != sequence[:-1]).sum(axis=0)
+
+    expected = 2 * n1 * n2 / n + 1
+    variance = 2 * n1 * n2 * (2 * n1 * n2 - n) / (n**2 * (n - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(variance > 0, (runs - expected) / np.sqrt(variance), 0.0)
+    p_values = _normal_two_sided_p(z)
+
+    per_number = {
+        number: {
+            "runs": int(runs[i]),
+            "expected_runs": round(float(expected[i]), 2),
+            "z": round(float(z[i]), 4),
+            "p_value": round(float(p_values[i]), 6),
+        }
+        for i, number in enumerate(range(1, MAX_NUMBER + 1))
+    }
+    significant = [number for number, row in per_number.items() if row["p_value"] < ALPHA]
+    return {
+        "per_number": per_number,
+        "significant_numbers": significant,
+        # 유의수준 5%에서 우연히 기각될 것으로 기대되는 번호 수
+        "expected_false_positives": round(MAX_NUMBER * ALPHA, 2),
+    }
+
+
+def _distribution(counts: np.ndarray, expected_probs: list[float], draws: int) -> dict:
+    observed = np.bincount(counts, minlength=len(expected_probs))[: len(expected_probs)]
+    expected = np.asarray(expected_probs) * draws
+    mask = expected > 0
+    statistic = float(((observed[mask] - expected[mask]) ** 2 / expected[mask]).sum())
+    dof = int(mask.sum()) - 1
+    return {
+        "observed": {k: int(v) for k, v in enumerate(observed)},
+        "expected": {k: round(float(v), 2) for k, v in enumerate(expected)},
+        "chi_square": round(statistic, 4),
+        "p_value": round(chi_square_p_value(statistic, dof), 6) if dof > 0 else None,
+    }
+
+
+def _consecutive_distribution(sorted_matrix: np.ndarray) -> dict:
+    """회차별 연속 번호 쌍 개수 분포"""
+    pairs = (np.diff(sorted_matrix, axis=1) == 1).sum(axis=1)
+    total = math.comb(MAX_NUMBER, PICK_COUNT)
+    # 연속 쌍이 정확히 j개인 조합 수: C(k-1, j) * C(n-k+1, k-j)
+    probs = [
+        math.comb(PICK_COUNT - 1, j)
+        * math.comb(MAX_NUMBER - PICK_COUNT + 1, PICK_COUNT - j)
+        / total
+        for j in range(PICK_COUNT)
+    ]
+    return _distribution(pairs, probs, len(sorted_matrix))
+
+
+def _odd_even_distribution(matrix: np.ndarray) -> dict:
+    """회차별 홀수 개수 분포 (초기하분포 기대값과 비교)"""
+    odds = (matrix % 2 == 1).sum(axis=1)
+    odd_total = (MAX_NUMBER + 1) // 2
+    even_total = MAX_NUMBER - odd_total
+    total = math.comb(MAX_NUMBER, PICK_COUNT)
+    probs = [
+        math.comb(odd_total, k) * math.comb(even_total, PICK_COUNT - k) / total
+        for k in range(PICK_COUNT + 1)
+    ]
+    return _distribution(odds, probs, len(matrix))
+
+
+def _sum_distribution(matrix: np.ndarray) -> dict:
+    """회차별 번호 합계 분포"""
+    sums = matrix.sum(axis=1)
+    low = PICK_COUNT * (PICK_COUNT + 1) // 2
+    high = sum(range(MAX_NUMBER - PICK_COUNT + 1, MAX_NUMBER + 1))
+    edges = np.arange(low, high + SUM_BIN_WIDTH, SUM_BIN_WIDTH)
+    counts, _ = np.histogram(sums, bins=edges)
+
+    # 비복원 추출 합계의 이론적 평균/표준편차
+    population = np.arange(1, MAX_NUMBER + 1)
+    mean = PICK_COUNT * population.mean()
+    variance = (
+        PICK_COUNT * population.var() * (MAX_NUMBER - PICK_COUNT) / (MAX_NUMBER - 1)
+    )
+    return {
+        "bins": [
+            {"low": int(edges[i]), "high": int(edges[i + 1]) - 1, "count": int(count)}
+            for i, count in enumerate(counts)
+        ],
+        "mean": round(float(sums.mean()), 2) if len(sums) else None,
+        "std": round(float(sums.std()), 2) if len(sums) else None,
+        "expected_mean": round(float(mean), 2),
+        "expected_std": round(math.sqrt(variance), 2),
+    }
+
+
+def compute_draw_statistics(matrix: np.ndarray) -> dict:
+    """
+    당첨 번호 행렬에 대한 통계 검정을 계산합니다.
+
+    Args:
+        matrix: (회차 수 x 6) 당첨 번호 행렬 (회차 오름차순)
+
+    Returns:
+        uniformity/runs/consecutive/odd_even/sum_range 결과 딕셔너리
+    """
+    sorted_matrix = np.sort(matrix, axis=1)
+    hits = _hits_matrix(sorted_matrix)
+    return {
+        "draws": len(matrix),
+        "uniformity": _uniformity_test(hits),
+        "runs": _runs_test(hits),
+        "consecutive": _consecutive_distribution(sorted_matrix),
+        "odd_even": _odd_even_distribution(sorted_matrix),
+        "sum_range": _sum_distribution(sorted_matrix),
+    }
+
+
+def get_draw_statistics(df: pd.DataFrame) -> Optional[dict]:
+    """
+    히스토리 통계 검정 결과를 반환합니다. 데이터 버전별로 캐시됩니다.
+
+    Args:
+        df: 로또 당첨 번호 DataFrame
+
+    Returns:
+        통계 결과 딕셔너리 또는 데이터가 부족하면 None
+    """
+    if len(df) < 2:
+        return None
+
+    version = get_data_version(df)
+    cached = _cache.get(version)
+    if cached is not None:
+        return cached
+
+    with _cache_lock:
+        if version not in _cache:
+            result = compute_draw_statistics(get_draw_matrix(df))
+            result["version"] = version
+            _cache.clear()
+            _cache[version] = result
+        return _cache[version]
@@ -3,11 +3,24 @@
 동행복권 사이트에서 당첨번호를 가져오는 로직
 """
 
-from typing import Optional, TypedDict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, TypedDict
 import requests
 from bs4 import BeautifulSoup
 
 from .constants import DHLOTTERY_API_URL, DHLOTTERY_MAIN_URL, DEFAULT_TIMEOUT
+from .draw_calendar import predict_latest_draw_number
+
+# 범위 조회 시 기본 동시 요청 수
+DEFAULT_FETCH_WORKERS = 8
+
+# 일정 예측이 실제보다 앞설 수 있는 최대 회차 수 (결과 공개 지연 등)
+MAX_SCHEDULE_DRIFT = 8
+
+# 확정된 회차 결과는 바뀌지 않으므로 프로세스 내에서 재사용
+_draw_cache: dict[int, "LottoDrawResult"] = {}
+_draw_cache_lock = threading.Lock()
 
 
 class LottoDrawResult(TypedDict):
@@ -36,6 +49,10 @@ def get_lotto_win_numbers(
     Returns:
         LottoDrawResult 또는 실패 시 None
     """
+    cached = _draw_cache.get(draw_no)
+    if cached is not None:
+        return LottoDrawResult(**cached)
+
     url = f"{DHLOTTERY_API_URL}{draw_no}"
     try:
         response = requests.get(url, timeout=timeout)
@@ -45,7 +62,7 @@ def get_lotto_win_numbers(
         if data.get("returnValue") != "success":
             return None
 
-        return LottoDrawResult(
+        result = LottoDrawResult(
             draw_no=data.get("drwNo"),
             num1=data.get("drwtNo1"),
             num2=data.get("drwtNo2"),
@@ -55,6 +72,9 @@ def get_lotto_win_numbers(
             num6=data.get("drwtNo6"),
             bonus=data.get("bnusNo"),
         )
+        with _draw_cache_lock:
+            _draw_cache[draw_no] = result
+        return LottoDrawResult(**result)
     except requests.exceptions.RequestException:
         return None
     except ValueError:
@@ -63,6 +83,45 @@ def get_lotto_win_numbers(
 
 
 def get_latest_draw_number(timeout: int = DEFAULT_TIMEOUT) -> Optional[int]:
+    """
+    최신 회차 번호를 가져옵니다.
+
+    추첨 일정으로 최신 회차를 예측한 뒤 getLottoNumber API로 확인합니다.
+    예측 회차가 아직 공개되지 않았으면 이전 회차 범위를 이진 탐색하며,
+    API로 어떤 회차도 확인되지 않을 때만 메인 페이지를 스크래핑합니다.
+
+    Args:
+        timeout: 요청 타임아웃 (초)
+
+    Returns:
+        최신 회차 번호 또는 실패 시 None
+    """
+    predicted = predict_latest_draw_number()
+    if predicted < 1:
+        return None
+
+    if get_lotto_win_numbers(predicted, timeout):
+        return predicted
+
+    # 추첨 직후 결과 공개 전이라면 대부분 직전 회차가 최신
+    if predicted > 1 and get_lotto_win_numbers(predicted - 1, timeout):
+        return predicted - 1
+
+    # lo는 공개된 회차, hi는 미공개 회차가 되도록 유지
+    lo, hi = max(predicted - MAX_SCHEDULE_DRIFT, 1), predicted - 1
+    if lo >= hi or not get_lotto_win_numbers(lo, timeout):
+        return _scrape_latest_draw_number(timeout)
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if get_lotto_win_numbers(mid, timeout):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _scrape_latest_draw_number(timeout: int = DEFAULT_TIMEOUT) -> Optional[int]:
     """
     동행복권 메인 페이지에서 최신 회차 번호를 가져옵니다.
 
@@ -85,20 +144,39 @@ def get_latest_draw_number(timeout: int = DEFAULT_TIMEOUT) -> Optional[int]:
         return None
 
 
-def fetch_draw_range(start_no: int, end_no: int) -> list[LottoDrawResult]:
+def fetch_draws(
+    draw_nos: Iterable[int], workers: int = DEFAULT_FETCH_WORKERS
+) -> list[LottoDrawResult]:
+    """
+    여러 회차 데이터를 동시에 가져옵니다.
+
+    Args:
+        draw_nos: 회차 번호 목록
+        workers: 동시 요청 수
+
+    Returns:
+        입력 순서대로의 LottoDrawResult 리스트 (가져오지 못한 회차는 제외)
+    """
+    draw_nos = list(draw_nos)
+    if not draw_nos:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(draw_nos)))) as executor:
+        return [result for result in executor.map(get_lotto_win_numbers, draw_nos) if result]
+
+
+def fetch_draw_range(
+    start_no: int, end_no: int, workers: int = DEFAULT_FETCH_WORKERS
+) -> list[LottoDrawResult]:
     """
-    지정된 범위의 회차 데이터를 가져옵니다.
+    지정된 범위의 회차 데이터를 동시에 가져옵니다.
 
     Args:
         start_no: 시작 회차
         end_no: 끝 회차 (포함)
+        workers: 동시 요청 수
 
     Returns:
-        LottoDrawResult 리스트
+        회차 오름차순 LottoDrawResult 리스트 (가져오지 못한 회차는 제외)
     """
-    results = []
-    for draw_no in range(start_no, end_no + 1):
-        result = get_lotto_win_numbers(draw_no)
-        if result:
-            results.append(result)
-    return results
+    return fetch_draws(range(start_no, end_no + 1), workers)
@@ -0,0 +1,366 @@
+"""
+요청 프로파일링 모듈
+관리자 요청 또는 샘플링된 요청의 콜스택을 주기적으로 수집하여
+플레임 그래프용 collapsed stack 형식으로 보관
+"""
+
+import functools
+import hmac
+import inspect
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# 프로파일 요청 헤더/쿼리 파라미터 (관리자 토큰 필요)
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# 관리자 토큰 환경변수 (없으면 관리자 프로파일링 비활성화)
+ADMIN_TOKEN_ENV = "LOTTO_ADMIN_TOKEN"
+
+# 자동 프로파일링할 요청 비율 환경변수 (0~1, 기본 0)
+PROFILE_SAMPLE_RATE_ENV = "LOTTO_PROFILE_SAMPLE_RATE"
+
+# 스택 수집 간격 (초)
+DEFAULT_INTERVAL = 0.005
+
+# 자동 수집 프로파일 중 보관할 느린 요청 수와 보관 기간 (초)
+SLOW_PROFILE_LIMIT = 20
+SLOW_PROFILE_WINDOW = 3600
+
+# 관리자 요청 프로파일 보관 수
+FORCED_PROFILE_LIMIT = 20
+
+MAX_STACK_DEPTH = 128
+
+# 현재 요청의 프로파일 세션 (스레드풀 실행에도 전파됨)
+current_profile: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "current_profile", default=None
+)
+
+_session_ids = itertools.count(1)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _collapse(frame: Any) -> str:
+    """프레임 체인을 루트부터 ';'로 연결한 문자열로 변환합니다."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class ProfileSession:
+    """
+    요청 1건의 샘플링 결과.
+
+    요청 스코프와 스트리밍 본문(profiled_stream)이 각각 세션을 붙잡으며,
+    모두 놓였을 때 수집을 마치고 on_finish를 호출합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        forced: bool,
+        on_finish: Optional[Callable[["ProfileSession"], None]] = None,
+    ):
+        self.id = f"{int(time.time())}-{next(_session_ids)}"
+        self.name = name
+        self.forced = forced
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._threads: set[int] = set()
+        self._on_finish = on_finish
+        self._started = time.perf_counter()
+        self._holds = 1
+        self._holds_lock = threading.Lock()
+
+    def hold(self) -> None:
+        """응답 본문이 끝날 때까지 세션을 유지합니다 (release와 짝)."""
+        with self._holds_lock:
+            self._holds += 1
+
+    def release(self) -> None:
+        """세션을 놓습니다. 마지막으로 놓이면 수집을 마칩니다."""
+        with self._holds_lock:
+            self._holds -= 1
+            finished = self._holds == 0
+        if finished:
+            self.duration = time.perf_counter() - self._started
+            if self._on_finish is not None:
+                self._on_finish(self)
+
+    def add_thread(self, thread_id: int) -> None:
+        self._threads.add(thread_id)
+
+    def remove_thread(self, thread_id: int) -> None:
+        self._threads.discard(thread_id)
+
+    def collect(self, frames: dict[int, Any]) -> None:
+        for thread_id in list(self._threads):
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope에서 읽을 수 있는 collapsed stack 텍스트"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "forced": self.forced,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "samples": self.samples,
+        }
+
+
+class StackSampler:
+    """
+    활성 세션에 등록된 스레드의 콜스택을 주기적으로 수집하는 백그라운드 스레드.
+    활성 세션이 있을 때만 동작합니다.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self._sessions: set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profile-sampler", daemon=True
+                )
+                self._thread.start()
+            self._wakeup.notify()
+
+    def detach(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._sessions:
+                    self._wakeup.wait()
+                sessions = list(self._sessions)
+
+            frames = sys._current_frames()
+            for session in sessions:
+                session.collect(frames)
+            del frames
+            time.sleep(self.interval)
+
+
+class RequestProfiler:
+    """
+    요청 프로파일러.
+
+    관리자 토큰과 함께 프로파일을 요청한 경우 항상 수집하고, 그 외 요청은
+    sample_rate 비율로 수집하여 보관 기간 내 가장 느린 요청만 남깁니다.
+    """
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        admin_token: Optional[str] = None,
+        interval: float = DEFAULT_INTERVAL,
+        slow_limit: int = SLOW_PROFILE_LIMIT,
+        slow_window: float = SLOW_PROFILE_WINDOW,
+    ):
+        """
+        Args:
+            sample_rate: 자동 수집 비율 (None이면 환경변수)
+            admin_token: 관리자 토큰 (None이면 환경변수)
+            interval: 스택 수집 간격 (초)
+            slow_limit: 보관할 느린 요청 프로파일 수
+            slow_window: 느린 요청 프로파일 보관 기간 (초)
+        """
+        if sample_rate is None:
+            try:
+                sample_rate = float(os.getenv(PROFILE_SAMPLE_RATE_ENV, "0"))
+            except ValueError:
+                sample_rate = 0.0
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.admin_token = admin_token if admin_token is not None else os.getenv(ADMIN_TOKEN_ENV)
+        self.slow_limit = slow_limit
+        self.slow_window = slow_window
+        self._sampler = StackSampler(interval)
+        self._forced: dict[str, ProfileSession] = {}
+        self._slow: list[ProfileSession] = []
+        self._lock = threading.Lock()
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        """관리자 토큰이 설정되어 있고 일치하는지 확인합니다."""
+        if not self.admin_token or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def is_requested(self, flag: Optional[str], token: Optional[str]) -> bool:
+        """관리자가 프로파일 플래그(헤더 또는 쿼리)를 지정했는지 확인합니다."""
+        return flag not in (None, "", "0", "false") and self.is_admin(token)
+
+    @contextmanager
+    def profile(self, name: str, forced: bool = False) -> Iterator[Optional[ProfileSession]]:
+        """
+        요청 1건을 프로파일링합니다. 수집 대상이 아니면 None을 반환합니다.
+        샘플링 스레드는 thread_scope로 등록한 스레드만 수집합니다.
+
+        Args:
+            name: 요청 이름 (예: "POST /api/update")
+            forced: 관리자 요청 여부 (True면 항상 수집하고 보관)
+        """
+        if not forced and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            yield None
+            return
+
+        session = ProfileSession(name, forced, on_finish=self._finish)
+        context_token = current_profile.set(session)
+        self._sampler.attach(session)
+        try:
+            yield session
+        finally:
+            current_profile.reset(context_token)
+            # 스트리밍 본문이 남아 있으면 본문이 끝날 때 수집을 마칩니다
+            session.release()
+
+    def _finish(self, session: ProfileSession) -> None:
+        self._sampler.detach(session)
+        self._store(session)
+
+    def _store(self, session: ProfileSession) -> None:
+        with self._lock:
+            if session.forced:
+                self._forced[session.id] = session
+                while len(self._forced) > FORCED_PROFILE_LIMIT:
+                    self._forced.pop(next(iter(self._forced)))
+                return
+
+            # 보관 기간이 지난 프로파일을 버리고 가장 느린 요청만 유지
+            cutoff = time.time() - self.slow_window
+            self._slow = [s for s in self._slow if s.started_at >= cutoff]
+            self._slow.append(session)
+            self._slow.sort(key=lambda s: s.duration, reverse=True)
+            del self._slow[self.slow_limit :]
+
+    def list_profiles(self) -> list[dict]:
+        """보관 중인 프로파일 요약 (관리자 요청 최신순, 이후 느린 요청순)"""
+        with self._lock:
+            sessions = list(reversed(self._forced.values())) + list(self._slow)
+        return [session.summary() for session in sessions]
+
+    def get_profile(self, profile_id: str) -> Optional[ProfileSession]:
+        """프로파일 ID로 세션을 반환합니다. 없으면 None."""
+        with self._lock:
+            session = self._forced.get(profile_id)
+            if session is None:
+                session = next((s for s in self._slow if s.id == profile_id), None)
+        return session
+
+
+@contextmanager
+def thread_scope() -> Iterator[None]:
+    """현재 요청이 프로파일링 중이면 실행 중인 스레드를 샘플링 대상으로 등록합니다."""
+    session = current_profile.get()
+    if session is None:
+        yield
+        return
+
+    thread_id = threading.get_ident()
+    session.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        session.remove_thread(thread_id)
+
+
+class _ProfiledStream:
+    """본문을 다 읽거나 닫을 때까지 세션을 붙잡고, 항목을 만드는 스레드를 등록하는 이터레이터"""
+
+    def __init__(self, iterator: Iterator, session: ProfileSession):
+        self._iterator = iterator
+        self._session: Optional[ProfileSession] = session
+        session.hold()
+
+    def __iter__(self) -> "_ProfiledStream":
+        return self
+
+    def __next__(self) -> Any:
+        session = self._session
+        if session is None:
+            raise StopIteration
+        thread_id = threading.get_ident()
+        session.add_thread(thread_id)
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            session.remove_thread(thread_id)
+
+    def close(self) -> None:
+        session, self._session = self._session, None
+        if session is None:
+            return
+        if hasattr(self._iterator, "close"):
+            self._iterator.close()
+        session.release()
+
+    def __del__(self) -> None:
+        # 클라이언트가 끊겨 끝까지 읽히지 않은 본문도 세션을 놓습니다
+        self.close()
+
+
+def profiled_stream(body: Iterable) -> Iterator:
+    """
+    스트리밍 응답 본문을 현재 요청의 프로파일에 포함합니다.
+    본문은 핸들러가 반환된 뒤 다른 스레드에서 순회되므로, 프로파일링 중이면
+    본문이 끝날 때까지 세션을 유지합니다. 프로파일링 중이 아니면 그대로 반환합니다.
+    """
+    session = current_profile.get()
+    if session is None:
+        return iter(body)
+    return _ProfiledStream(iter(body), session)
+
+
+def profiled(func: Callable) -> Callable:
+    """함수 실행 스레드를 현재 프로파일 세션에 등록하는 데코레이터"""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with thread_scope():
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with thread_scope():
+            return func(*args, **kwargs)
+
+    return wrapper
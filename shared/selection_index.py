@@ -0,0 +1,100 @@
+"""
+주간 선택 해시 색인 모듈
+(user_id, 티켓) 중복 제출 여부와 티켓별 선택 수를 상수 시간에 조회
+"""
+
+import hashlib
+from collections import Counter
+from typing import Optional
+
+TicketKey = tuple[int, ...]
+
+
+def ticket_key(numbers: list[int]) -> TicketKey:
+    """번호 순서와 무관한 티켓 키를 반환합니다."""
+    return tuple(sorted(int(number) for number in numbers))
+
+
+def selection_id(user_id: str, numbers: list[int]) -> str:
+    """(user_id, 티켓) 조합의 결정적 선택 ID (저장소의 중복 방지 키)"""
+    key = f"{user_id}:{','.join(map(str, ticket_key(numbers)))}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+class SelectionIndex:
+    """
+    한 주차의 사용자 선택 해시 색인.
+
+    색인 자체는 저장하지 않고 저장소에서 로드한 선택 목록으로 재구성합니다.
+    같은 주차의 목록이 뒤에 추가만 되었으면 새로 추가된 선택만 색인합니다.
+    """
+
+    def __init__(self):
+        self.week = ""
+        self._entries: set[tuple[str, TicketKey]] = set()
+        self._ticket_counts: Counter = Counter()
+        self._user_ids: set[str] = set()
+        self._count = 0
+        self._last: Optional[tuple[str, TicketKey]] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def unique_users(self) -> int:
+        return len(self._user_ids)
+
+    def _clear(self, week: str) -> None:
+        self.week = week
+        self._entries.clear()
+        self._ticket_counts.clear()
+        self._user_ids.clear()
+        self._count = 0
+        self._last = None
+
+    def sync(self, week: str, users: list[dict]) -> None:
+        """
+        선택 목록과 색인을 맞춥니다.
+
+        Args:
+            week: 주차 키
+            users: 저장 순서대로의 사용자 선택 목록
+        """
+        appended = (
+            week == self.week
+            and len(users) >= self._count
+            and (self._count == 0 or self._entry(users[self._count - 1]) == self._last)
+        )
+        if not appended:
+            self._clear(week)
+        for user in users[self._count :]:
+            self.add(user.get("user_id", ""), user.get("numbers", []))
+
+    @staticmethod
+    def _entry(user: dict) -> tuple[str, TicketKey]:
+        return user.get("user_id", ""), ticket_key(user.get("numbers", []))
+
+    def contains(self, user_id: str, numbers: list[int]) -> bool:
+        """사용자가 이 티켓을 이미 제출했는지 확인합니다."""
+        return (user_id, ticket_key(numbers)) in self._entries
+
+    def add(self, user_id: str, numbers: list[int]) -> None:
+        key = ticket_key(numbers)
+        entry = (user_id, key)
+        self._entries.add(entry)
+        self._ticket_counts[key] += 1
+        if user_id:
+            self._user_ids.add(user_id)
+        self._count += 1
+        self._last = entry
+
+    def popularity(self, numbers: list[int]) -> int:
+        """이 티켓(번호 조합)을 선택한 횟수"""
+        return self._ticket_counts.get(ticket_key(numbers), 0)
+
+    def most_common(self, count: int = 10) -> list[dict]:
+        """가장 많이 선택된 티켓"""
+        return [
+            {"numbers": list(key), "count": picks}
+            for key, picks in self._ticket_counts.most_common(count)
+        ]
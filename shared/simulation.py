@@ -0,0 +1,300 @@
+"""
+티켓 포트폴리오 몬테카를로 시뮬레이션 모듈
+무작위 당첨 번호(보너스 포함)를 대량으로 생성해 calculate_prize_rank 규칙으로
+포트폴리오 전체를 배치 단위로 채점하고, 등수별 확률과 기대 당첨 수를 추정
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+
+from .analysis import MAX_NUMBER
+from .constants import PRIZE_RANKS
+from .ticket_index import PICK_COUNT, validate_ticket
+
+DEFAULT_ITERATIONS = 1_000_000
+DEFAULT_TIME_BUDGET = 5.0
+
+# API 요청 한도
+MAX_ITERATIONS = 5_000_000
+MAX_TIME_BUDGET = 10.0
+MAX_TICKETS = 1000
+
+# 배치 1회에 채점할 (추첨 x 티켓) 수와 추첨 수 상한 (배치당 메모리 수십 MB 이내)
+BATCH_WORK = 2_000_000
+MAX_BATCH_DRAWS = 50_000
+
+# 작업 1건의 (추첨 x 티켓) 수와 추첨 수 범위 (시간 예산/수렴 확인 단위, 1건 0.2초 안팎)
+CHUNK_WORK = 10_000_000
+MIN_CHUNK_DRAWS = 10_000
+MAX_CHUNK_DRAWS = 200_000
+
+# 수렴 기록 최대 개수
+MAX_CONVERGENCE_POINTS = 50
+
+# (일치 개수 * 2 + 보너스 일치) → 등수
+_RANK_TABLE = np.zeros((PICK_COUNT + 1) * 2, dtype=np.int64)
+_RANK_TABLE[[6 * 2, 6 * 2 + 1]] = 1
+_RANK_TABLE[5 * 2 + 1] = 2
+_RANK_TABLE[5 * 2] = 3
+_RANK_TABLE[[4 * 2, 4 * 2 + 1]] = 4
+_RANK_TABLE[[3 * 2, 3 * 2 + 1]] = 5
+
+# 등수 인덱스 (0=낙첨, 1~5등)
+_RANKS = len(PRIZE_RANKS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _ticket_masks(tickets: list[list[int]]) -> np.ndarray:
+    """(티켓 수 x 46) 번호 포함 여부 행렬 (열 0은 사용하지 않음)"""
+    masks = np.zeros((len(tickets), MAX_NUMBER + 1), dtype=np.float32)
+    for row, ticket in enumerate(tickets):
+        masks[row, ticket] = 1
+    return masks
+
+
+def _simulate_chunk(
+    masks: np.ndarray,
+    draws: int,
+    seed: np.random.SeedSequence,
+    deadline: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    무작위 추첨 draws회에 대해 포트폴리오를 채점합니다 (프로세스 풀 작업 단위).
+
+    Args:
+        masks: 티켓 번호 포함 여부 행렬
+        draws: 추첨 횟수
+        seed: 독립 난수 스트림 시드
+        deadline: 이 시각(time.time())이 지나면 남은 배치를 건너뜀
+
+    Returns:
+        (최고 등수별 추첨 수, 등수별 티켓 당첨 수) 배열 튜플 (합계가 실제 추첨 수)
+    """
+    rng = np.random.default_rng(seed)
+    best_counts = np.zeros(_RANKS, dtype=np.int64)
+    hit_counts = np.zeros(_RANKS, dtype=np.int64)
+    batch_size = max(1, min(MAX_BATCH_DRAWS, BATCH_WORK // len(masks)))
+
+    done = 0
+    while done < draws and (deadline is None or done == 0 or time.time() < deadline):
+        size = min(batch_size, draws - done)
+        # 난수 키가 작은 7개 번호: 앞 6개는 당첨 번호, 7번째는 보너스 번호
+        picks = np.argpartition(rng.random((size, MAX_NUMBER)), PICK_COUNT, axis=1)
+        picks = picks[:, : PICK_COUNT + 1] + 1
+
+        winning = np.zeros((size, MAX_NUMBER + 1), dtype=np.float32)
+        winning[np.arange(size)[:, None], picks[:, :PICK_COUNT]] = 1
+
+        matches = (winning @ masks.T).astype(np.int64)
+        bonus = masks[:, picks[:, PICK_COUNT]].T.astype(np.int64)
+        ranks = _RANK_TABLE[matches * 2 + bonus]
+
+        hit_counts += np.bincount(ranks.ravel(), minlength=_RANKS)
+        best = np.where(ranks == 0, _RANKS, ranks).min(axis=1)
+        best[best == _RANKS] = 0
+        best_counts += np.bincount(best, minlength=_RANKS)
+        done += size
+
+    return best_counts, hit_counts
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    요청마다 프로세스를 띄우지 않도록 CPU 수 크기의 프로세스 풀을 재사용합니다.
+    서버 프로세스는 스레드(uvicorn, 프로파일 샘플러)를 쓰므로 fork 대신
+    forkserver(없으면 spawn)로 작업 프로세스를 만듭니다.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=context)
+        return _executor
+
+
+def single_ticket_odds() -> dict[str, float]:
+    """티켓 1장의 등수별 정확한 확률"""
+    total = math.comb(MAX_NUMBER, PICK_COUNT)
+    others = MAX_NUMBER - PICK_COUNT
+    odds = {
+        1: 1,
+        2: PICK_COUNT,
+        3: PICK_COUNT * (others - 1),
+        4: math.comb(PICK_COUNT, 4) * math.comb(others, 2),
+        5: math.comb(PICK_COUNT, 3) * math.comb(others, 3),
+    }
+    result = {PRIZE_RANKS[rank]: count / total for rank, count in odds.items()}
+    result[PRIZE_RANKS[0]] = 1 - sum(result.values())
+    return result
+
+
+def parse_simulation_request(body: dict) -> dict:
+    """
+    API 요청 본문을 simulate_portfolio 인자로 변환하고 한도를 적용합니다.
+
+    Args:
+        body: tickets, iterations, time_budget, tolerance 키를 가진 딕셔너리
+
+    Returns:
+        simulate_portfolio 키워드 인자
+
+    Raises:
+        ValueError: 티켓 수가 한도를 넘거나 값의 형식이 잘못된 경우
+    """
+    tickets = body.get("tickets") or []
+    if len(tickets) > MAX_TICKETS:
+        raise ValueError(f"티켓은 최대 {MAX_TICKETS}장까지 시뮬레이션할 수 있습니다")
+    try:
+        iterations = int(body.get("iterations") or DEFAULT_ITERATIONS)
+        time_budget = float(body.get("time_budget") or DEFAULT_TIME_BUDGET)
+        tolerance = body.get("tolerance")
+        tolerance = float(tolerance) if tolerance is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("iterations, time_budget, tolerance는 숫자여야 합니다")
+
+    return {
+        "tickets": tickets,
+        "iterations": min(max(iterations, 1), MAX_ITERATIONS),
+        "time_budget": min(max(time_budget, 0.1), MAX_TIME_BUDGET),
+        "tolerance": tolerance,
+    }
+
+
+def simulate_portfolio(
+    tickets: list[list[int]],
+    iterations: int = DEFAULT_ITERATIONS,
+    time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+    tolerance: Optional[float] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    티켓 포트폴리오의 등수 분포를 몬테카를로로 추정합니다.
+
+    작업은 독립 난수 스트림(SeedSequence.spawn)을 가진 청크로 나뉘어 프로세스 풀에서
+    실행되며, 청크가 끝날 때마다 반복 수/시간 예산/수렴 조건을 확인합니다.
+
+    Args:
+        tickets: 티켓 목록 (각 1~45 범위의 서로 다른 6개 번호)
+        iterations: 최대 추첨 시뮬레이션 횟수
+        time_budget: 최대 실행 시간 (초, None이면 제한 없음)
+        tolerance: 1개 이상 당첨 확률의 95% 신뢰구간 반폭이 이 값 이하면 조기 종료
+        workers: 동시에 실행할 청크 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        seed: 재현용 시드
+
+    Returns:
+        최고 등수 확률, 당첨 확률 신뢰구간, 등수별 기대 당첨 수, 수렴 기록 딕셔너리
+
+    Raises:
+        ValueError: 티켓이 없거나 유효하지 않은 경우
+    """
+    if not tickets:
+        raise ValueError("티켓이 1장 이상 필요합니다")
+    if iterations < 1:
+        raise ValueError("iterations는 1 이상이어야 합니다")
+    tickets = [validate_ticket(ticket) for ticket in tickets]
+    masks = _ticket_masks(tickets)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunk_draws = min(MAX_CHUNK_DRAWS, max(MIN_CHUNK_DRAWS, CHUNK_WORK // len(tickets)))
+    root_seed = np.random.SeedSequence(seed)
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    # 작업 프로세스와 공유하는 벽시계 기준 마감 시각
+    wall_deadline = time.time() + time_budget if time_budget else None
+
+    best_counts = np.zeros(_RANKS, dtype=np.int64)
+    hit_counts = np.zeros(_RANKS, dtype=np.int64)
+    convergence = []
+    state = {"submitted": 0, "stopped_by": "iterations"}
+
+    def next_chunk() -> Optional[tuple[int, np.random.SeedSequence]]:
+        remaining = iterations - state["submitted"]
+        if remaining <= 0:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            state["stopped_by"] = "time_budget"
+            return None
+        if (
+            tolerance is not None
+            and convergence
+            and convergence[-1]["ci95_halfwidth"] <= tolerance
+        ):
+            state["stopped_by"] = "converged"
+            return None
+        draws = min(chunk_draws, remaining)
+        state["submitted"] += draws
+        return draws, root_seed.spawn(1)[0]
+
+    def record(result: tuple[np.ndarray, np.ndarray]) -> None:
+        best, hits = result
+        best_counts[:] += best
+        hit_counts[:] += hits
+        completed = int(best_counts.sum())
+        p = 1 - best_counts[0] / completed
+        se = math.sqrt(p * (1 - p) / completed)
+        convergence.append(
+            {
+                "iterations": completed,
+                "any_prize_probability": round(float(p), 6),
+                "ci95_halfwidth": round(1.96 * se, 6),
+            }
+        )
+
+    if workers == 1:
+        while (chunk := next_chunk()) is not None:
+            record(_simulate_chunk(masks, *chunk, wall_deadline))
+    else:
+        executor = get_process_pool()
+        pending = set()
+        while True:
+            while len(pending) < workers and (chunk := next_chunk()) is not None:
+                pending.add(executor.submit(_simulate_chunk, masks, *chunk, wall_deadline))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(future.result())
+
+    completed = int(best_counts.sum())
+    if completed < iterations and state["stopped_by"] == "iterations":
+        # 마지막 청크들이 마감 시각에 멈춘 경우
+        state["stopped_by"] = "time_budget"
+    p = float(1 - best_counts[0] / completed)
+    se = math.sqrt(p * (1 - p) / completed)
+    step = max(1, math.ceil(len(convergence) / MAX_CONVERGENCE_POINTS))
+    points = convergence[::step]
+    if points[-1] is not convergence[-1]:
+        points.append(convergence[-1])
+
+    return {
+        "tickets": len(tickets),
+        "iterations": completed,
+        "workers": workers,
+        "elapsed": round(time.perf_counter() - started, 3),
+        "stopped_by": state["stopped_by"],
+        "rank_probability": {
+            PRIZE_RANKS[rank]: float(best_counts[rank] / completed) for rank in range(_RANKS)
+        },
+        "any_prize_probability": p,
+        "standard_error": se,
+        "ci95": [max(0.0, p - 1.96 * se), min(1.0, p + 1.96 * se)],
+        "expected_hits": {
+            PRIZE_RANKS[rank]: float(hit_counts[rank] / completed) for rank in range(1, _RANKS)
+        },
+        "single_ticket_odds": single_ticket_odds(),
+        "convergence": points,
+    }
@@ -0,0 +1,225 @@
+"""
+분석 스냅샷 모듈
+업데이트 파이프라인이 전체 히스토리와 사전 계산된 분석 결과(빈도/순위,
+간격·전이 인덱스, 전략 후보 풀)를 버전이 붙은 Firestore 문서 1개로 게시하고,
+인스턴스는 시작 시 회차 문서 전체 대신 이 문서 1개를 읽어 상태를 복원
+"""
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from .analysis import WIN_COLUMNS, GapIndex, TransitionIndex, analyze_number_frequency, get_data_version
+from .constants import COLLECTION_ANALYSIS_SNAPSHOT, DOC_ANALYSIS_SNAPSHOT
+from .strategies import AnalysisContext, StrategyPool, StrategyPools
+
+# 페이로드 구조가 바뀌면 올립니다 (다른 스키마의 스냅샷은 무시하고 전체 로드)
+SNAPSHOT_SCHEMA = 1
+
+HISTORY_COLUMNS = ["draw_no", *WIN_COLUMNS, "bonus"]
+
+_GAP_FIELDS = ("last_seen", "gap_sum", "gap_count", "max_gap")
+_TRANSITION_FIELDS = ("counts", "appearances", "carry_over", "last_hits")
+
+
+def history_digest(df: pd.DataFrame) -> str:
+    """회차순 당첨 번호 전체의 SHA-256 (스냅샷 무결성/동일 히스토리 판별용)"""
+    if df.empty:
+        return hashlib.sha256(b"").hexdigest()
+    ordered = df.sort_values("draw_no")[HISTORY_COLUMNS].to_numpy(dtype="<i8")
+    return hashlib.sha256(ordered.tobytes()).hexdigest()
+
+
+def _dump_arrays(index: Any, fields: tuple[str, ...]) -> dict:
+    state = {field: getattr(index, field).tolist() for field in fields}
+    state["latest_draw"] = index.latest_draw
+    return state
+
+
+def _load_arrays(index: Any, state: dict, fields: tuple[str, ...]) -> Any:
+    for field in fields:
+        setattr(index, field, np.asarray(state[field], dtype=np.int64))
+    index.latest_draw = int(state["latest_draw"])
+    return index
+
+
+class AnalysisSnapshot:
+    """
+    데이터 버전 1개의 히스토리와 분석 결과 묶음.
+
+    회차 비트셋 역색인(TicketHistoryIndex)은 크기가 회차 수에 비례하므로 싣지 않고
+    복원한 히스토리로 다시 만듭니다.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        freq: Optional[pd.Series],
+        gap_index: GapIndex,
+        transition_index: TransitionIndex,
+        pools: dict[str, StrategyPool],
+        created_at: Optional[str] = None,
+    ):
+        self.df = df
+        self.freq = freq
+        self.gap_index = gap_index
+        self.transition_index = transition_index
+        self.pools = pools
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+        self.version = get_data_version(df)
+        self.digest = history_digest(df)
+
+    @property
+    def latest_draw(self) -> int:
+        return self.gap_index.latest_draw
+
+    @classmethod
+    def capture(
+        cls,
+        df: pd.DataFrame,
+        gap_index: GapIndex,
+        transition_index: TransitionIndex,
+        strategy_pools: StrategyPools,
+    ) -> "AnalysisSnapshot":
+        """
+        이미 계산된 현재 상태로 스냅샷을 만듭니다 (다시 계산하지 않음).
+
+        Args:
+            df: 로또 당첨 번호 DataFrame
+            gap_index: df와 같은 버전의 간격 인덱스
+            transition_index: df와 같은 버전의 전이 인덱스
+            strategy_pools: df와 같은 버전으로 갱신된 전략 풀
+        """
+        context = strategy_pools.context
+        freq = context.freq if context is not None else analyze_number_frequency(df)
+        pools = {name: StrategyPool(**pool) for name, pool in strategy_pools.to_dict().items()}
+        return cls(df, freq, gap_index, transition_index, pools)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "AnalysisSnapshot":
+        """전체 히스토리로 분석 결과를 계산해 스냅샷을 만듭니다 (백필 등 오프라인용)."""
+        df = df[HISTORY_COLUMNS].sort_values("draw_no").reset_index(drop=True)
+        strategy_pools = StrategyPools()
+        strategy_pools.refresh(AnalysisContext(df))
+        context = strategy_pools.context
+        return cls.capture(df, context.gap_index, context.transition_index, strategy_pools)
+
+    def context(self) -> AnalysisContext:
+        """전략 풀 복원에 쓸 분석 컨텍스트"""
+        return AnalysisContext(
+            self.df,
+            freq=self.freq,
+            gap_index=self.gap_index,
+            transition_index=self.transition_index,
+        )
+
+    def to_payload(self) -> dict:
+        frequency = self.freq if self.freq is not None else pd.Series(dtype=np.int64)
+        return {
+            "schema": SNAPSHOT_SCHEMA,
+            "version": self.version,
+            "digest": self.digest,
+            "created_at": self.created_at,
+            "draws": {
+                column: self.df[column].astype(int).tolist() if not self.df.empty else []
+                for column in HISTORY_COLUMNS
+            },
+            # 출현 빈도 내림차순 (순위 순서 유지)
+            "frequency": [[int(number), int(count)] for number, count in frequency.items()],
+            "gap_index": _dump_arrays(self.gap_index, _GAP_FIELDS),
+            "transition_index": _dump_arrays(self.transition_index, _TRANSITION_FIELDS),
+            "strategy_pools": {name: pool.to_dict() for name, pool in self.pools.items()},
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> Optional["AnalysisSnapshot"]:
+        """
+        페이로드로 스냅샷을 복원합니다.
+
+        Returns:
+            AnalysisSnapshot 또는 스키마가 다르거나 다이제스트가 맞지 않으면 None
+        """
+        if payload.get("schema") != SNAPSHOT_SCHEMA:
+            return None
+
+        df = pd.DataFrame(payload["draws"], columns=HISTORY_COLUMNS).astype(np.int64)
+        frequency = payload["frequency"]
+        freq = (
+            pd.Series(
+                [count for _, count in frequency],
+                index=[number for number, _ in frequency],
+                dtype=np.int64,
+            )
+            if frequency
+            else None
+        )
+        snapshot = cls(
+            df,
+            freq,
+            _load_arrays(GapIndex(), payload["gap_index"], _GAP_FIELDS),
+            _load_arrays(TransitionIndex(), payload["transition_index"], _TRANSITION_FIELDS),
+            {name: StrategyPool(**pool) for name, pool in payload["strategy_pools"].items()},
+            created_at=payload.get("created_at"),
+        )
+        if snapshot.digest != payload.get("digest"):
+            return None
+        return snapshot
+
+    def to_document(self) -> dict:
+        """Firestore 문서 (조회용 메타데이터 + zlib 압축 JSON 페이로드)"""
+        payload = json.dumps(self.to_payload(), separators=(",", ":")).encode("utf-8")
+        return {
+            "schema": SNAPSHOT_SCHEMA,
+            "version": self.version,
+            "digest": self.digest,
+            "latest_draw": self.latest_draw,
+            "draw_count": len(self.df),
+            "created_at": self.created_at,
+            "payload": zlib.compress(payload, 9),
+        }
+
+    @classmethod
+    def from_document(cls, data: dict) -> Optional["AnalysisSnapshot"]:
+        if data.get("schema") != SNAPSHOT_SCHEMA or not data.get("payload"):
+            return None
+        payload = json.loads(zlib.decompress(data["payload"]).decode("utf-8"))
+        return cls.from_payload(payload)
+
+    def publish(self, db: Any) -> bool:
+        """
+        스냅샷을 Firestore 문서 1개로 게시합니다.
+
+        Returns:
+            성공 여부
+        """
+        try:
+            db.collection(COLLECTION_ANALYSIS_SNAPSHOT).document(DOC_ANALYSIS_SNAPSHOT).set(
+                self.to_document()
+            )
+            print(f"분석 스냅샷 게시 완료: {self.version}")
+            return True
+        except Exception as e:
+            print(f"분석 스냅샷 게시 실패: {e}")
+            return False
+
+    @classmethod
+    def load(cls, db: Any) -> Optional["AnalysisSnapshot"]:
+        """
+        게시된 스냅샷을 읽습니다.
+
+        Returns:
+            AnalysisSnapshot 또는 없거나 사용할 수 없으면 None
+        """
+        try:
+            doc = db.collection(COLLECTION_ANALYSIS_SNAPSHOT).document(DOC_ANALYSIS_SNAPSHOT).get()
+            if not doc.exists:
+                return None
+            return cls.from_document(doc.to_dict())
+        except Exception as e:
+            print(f"분석 스냅샷 로드 실패: {e}")
+            return None
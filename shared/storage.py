@@ -0,0 +1,574 @@
+"""
+주간 통계 저장소 모듈
+WeeklyStatsManager가 사용하는 저장소 인터페이스와 Firestore/메모리/SQLite 구현
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, Optional
+
+from .constants import (
+    COLLECTION_WEEKLY_HISTORY,
+    COLLECTION_WEEKLY_SELECTIONS,
+    COLLECTION_WEEKLY_STATS,
+    DOC_STRATEGY_AGGREGATES,
+    FIRESTORE_BATCH_LIMIT,
+    SUBCOLLECTION_SELECTIONS,
+)
+from .selection_index import selection_id
+
+
+class WeeklyStatsStorage(ABC):
+    """
+    주간 통계 저장소 인터페이스.
+
+    현재 주 상태(users/current_week/results)와 아카이브된 주간 요약을 다룹니다.
+    구현체는 실패 시 예외를 그대로 올리며, 오류 처리는 WeeklyStatsManager가 담당합니다.
+    """
+
+    @abstractmethod
+    def load_current(self) -> Optional[dict]:
+        """현재 주 상태를 반환합니다. 저장된 상태가 없으면 None."""
+
+    @abstractmethod
+    def save_current(self, stats: dict) -> None:
+        """현재 주 상태 전체를 저장합니다."""
+
+    def load_results(self) -> Optional[dict]:
+        """
+        현재 주 상태에서 users를 뺀 current_week/results만 반환합니다. 없으면 None.
+        기본 구현은 전체 상태를 읽어 users를 버립니다.
+        """
+        stats = self.load_current()
+        if not stats:
+            return None
+        return {"current_week": stats.get("current_week", ""), "results": stats.get("results", {})}
+
+    def append_selection(self, stats: dict, selection: dict) -> bool:
+        """
+        사용자 선택 1건이 stats["users"]에 추가된 직후 호출됩니다.
+        기본 구현은 전체 상태를 다시 저장합니다.
+
+        Args:
+            stats: 선택이 이미 추가된 현재 주 상태
+            selection: 추가된 사용자 선택
+
+        Returns:
+            저장 여부 (같은 selection_id가 이미 저장되어 있으면 False)
+        """
+        self.save_current(stats)
+        return True
+
+    def clear_selections(self, week: str) -> None:
+        """
+        주차의 사용자 선택을 모두 삭제합니다 (주간 통계 강제 초기화).
+        기본 구현은 save_current가 빈 users로 덮어쓰므로 아무것도 하지 않습니다.
+        """
+
+    @abstractmethod
+    def archive_week(self, week: str, summary: dict) -> None:
+        """지난 주 요약을 히스토리에 저장합니다."""
+
+    @abstractmethod
+    def list_history(self, limit: int = 10, start_after: Optional[str] = None) -> list[dict]:
+        """
+        아카이브된 주간 요약을 최신순으로 반환합니다.
+
+        Args:
+            limit: 최대 개수
+            start_after: 이 주차보다 이전 주만 반환 (커서, None이면 최신부터)
+        """
+
+    @abstractmethod
+    def get_archived_week(self, week: str) -> Optional[dict]:
+        """아카이브된 주간 요약 1건을 반환합니다. 없으면 None."""
+
+    @abstractmethod
+    def load_aggregates(self) -> Optional[dict]:
+        """전략별 누적 성적 문서를 반환합니다. 없으면 None."""
+
+    @abstractmethod
+    def save_aggregates(self, aggregates: dict) -> None:
+        """전략별 누적 성적 문서를 저장합니다."""
+
+    def iter_selections(self, week: str, page_size: int = 500) -> Iterator[list[dict]]:
+        """
+        주차의 사용자 선택을 저장 순서대로 페이지 단위로 반환합니다.
+        기본 구현은 현재 주 상태 문서를 읽어 잘라서 반환합니다.
+
+        Args:
+            week: 주차 키
+            page_size: 페이지당 선택 수
+        """
+        stats = self.load_current()
+        if not stats or stats.get("current_week") != week:
+            return
+        users = stats.get("users", [])
+        for start in range(0, len(users), page_size):
+            yield users[start : start + page_size]
+
+
+class FirestoreStatsStorage(WeeklyStatsStorage):
+    """
+    Firestore 저장소 (weekly_stats/current 문서 + weekly_history 컬렉션).
+
+    사용자 선택은 현재 주 상태 문서의 users와 함께 주차별 하위 컬렉션
+    (weekly_selections/{주차}/selections)에 selection_id 문서로도 저장되므로,
+    지난 주를 포함한 주차별 내보내기를 문서 페이지 단위로 읽을 수 있습니다.
+    선택 문서 ID가 (user_id, 티켓)에서 결정되므로 create로 인스턴스 간 중복 제출을 거르고,
+    상태 문서의 users에는 ArrayUnion으로 추가해 다른 인스턴스의 선택을 덮어쓰지 않습니다.
+    """
+
+    def __init__(self, db: Any):
+        """
+        Args:
+            db: Firestore 클라이언트
+        """
+        self.db = db
+
+    def _current_ref(self) -> Any:
+        return self.db.collection(COLLECTION_WEEKLY_STATS).document("current")
+
+    def load_current(self) -> Optional[dict]:
+        doc = self._current_ref().get()
+        return doc.to_dict() if doc.exists else None
+
+    def load_results(self) -> Optional[dict]:
+        # users 배열은 읽지 않습니다 (필드 마스크)
+        doc = self._current_ref().get(field_paths=["current_week", "results"])
+        return doc.to_dict() if doc.exists else None
+
+    def save_current(self, stats: dict) -> None:
+        # users는 append_selection의 ArrayUnion으로만 늘어나므로, 오래된 메모리 상태로
+        # 다른 인스턴스가 추가한 선택을 덮어쓰지 않도록 결과/주차만 병합 저장합니다.
+        week = stats.get("current_week", "")
+        data = {"current_week": week, "results": stats.get("results", {})}
+        if not stats.get("users"):
+            # 새 주 시작: 다른 인스턴스가 이미 새 주로 넘기고 선택을 추가했으면 비우지 않음
+            current = self.load_current()
+            if not current or current.get("current_week") != week:
+                data["users"] = []
+        self._current_ref().set(data, merge=True)
+
+    def _selections_ref(self, week: str) -> Any:
+        return (
+            self.db.collection(COLLECTION_WEEKLY_SELECTIONS)
+            .document(week)
+            .collection(SUBCOLLECTION_SELECTIONS)
+        )
+
+    def append_selection(self, stats: dict, selection: dict) -> bool:
+        from google.api_core.exceptions import AlreadyExists
+        from google.cloud.firestore import ArrayUnion
+
+        sid = selection.get("selection_id") or selection_id(
+            selection.get("user_id", ""), selection.get("numbers", [])
+        )
+        # 결정적 ID 문서의 create는 인스턴스 간에도 한 번만 성공합니다 (중복 제출 거부)
+        try:
+            self._selections_ref(stats.get("current_week", "")).document(sid).create(selection)
+        except AlreadyExists:
+            return False
+        self._current_ref().set({"users": ArrayUnion([selection])}, merge=True)
+        return True
+
+    def clear_selections(self, week: str) -> None:
+        ref = self._selections_ref(week)
+        while True:
+            docs = ref.limit(FIRESTORE_BATCH_LIMIT).get()
+            if not docs:
+                break
+            batch = self.db.batch()
+            for doc in docs:
+                batch.delete(ref.document(doc.id))
+            batch.commit()
+        self._current_ref().set({"current_week": week, "users": []}, merge=True)
+
+    def iter_selections(self, week: str, page_size: int = 500) -> Iterator[list[dict]]:
+        # 문서 커서 페이지네이션: 같은 timestamp는 문서 ID 순서로 이어서 읽음
+        query = self._selections_ref(week).order_by("timestamp").limit(page_size)
+        last_doc = None
+        while True:
+            docs = (query.start_after(last_doc) if last_doc is not None else query).get()
+            if not docs:
+                break
+            yield [doc.to_dict() for doc in docs]
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+
+        if last_doc is None:
+            # 선택 문서를 쓰기 전에 저장된 현재 주는 상태 문서의 users로 내보냅니다
+            yield from super().iter_selections(week, page_size)
+
+    def archive_week(self, week: str, summary: dict) -> None:
+        self.db.collection(COLLECTION_WEEKLY_HISTORY).document(week).set(summary)
+
+    def list_history(self, limit: int = 10, start_after: Optional[str] = None) -> list[dict]:
+        query = self.db.collection(COLLECTION_WEEKLY_HISTORY).order_by(
+            "week", direction="DESCENDING"
+        )
+        if start_after is not None:
+            query = query.start_after({"week": start_after})
+        docs = query.limit(limit).get()
+        return [doc.to_dict() for doc in docs]
+
+    def get_archived_week(self, week: str) -> Optional[dict]:
+        doc = self.db.collection(COLLECTION_WEEKLY_HISTORY).document(week).get()
+        return doc.to_dict() if doc.exists else None
+
+    def _aggregates_ref(self) -> Any:
+        return self.db.collection(COLLECTION_WEEKLY_STATS).document(DOC_STRATEGY_AGGREGATES)
+
+    def load_aggregates(self) -> Optional[dict]:
+        doc = self._aggregates_ref().get()
+        return doc.to_dict() if doc.exists else None
+
+    def save_aggregates(self, aggregates: dict) -> None:
+        self._aggregates_ref().set(aggregates)
+
+
+class MemoryStatsStorage(WeeklyStatsStorage):
+    """프로세스 메모리 저장소 (재시작 시 초기화, 테스트/벤치마크용)"""
+
+    def __init__(self):
+        self._current: Optional[dict] = None
+        self._history: dict[str, dict] = {}
+        self._aggregates: Optional[dict] = None
+
+    def load_current(self) -> Optional[dict]:
+        return self._current
+
+    def save_current(self, stats: dict) -> None:
+        self._current = stats
+
+    def append_selection(self, stats: dict, selection: dict) -> bool:
+        self._current = stats
+        return True
+
+    def archive_week(self, week: str, summary: dict) -> None:
+        self._history[week] = dict(summary)
+
+    def list_history(self, limit: int = 10, start_after: Optional[str] = None) -> list[dict]:
+        weeks = sorted(
+            (week for week in self._history if start_after is None or week < start_after),
+            reverse=True,
+        )[:limit]
+        return [dict(self._history[week]) for week in weeks]
+
+    def get_archived_week(self, week: str) -> Optional[dict]:
+        summary = self._history.get(week)
+        return dict(summary) if summary else None
+
+    def load_aggregates(self) -> Optional[dict]:
+        return self._aggregates
+
+    def save_aggregates(self, aggregates: dict) -> None:
+        self._aggregates = aggregates
+
+
+class SQLiteStatsStorage(WeeklyStatsStorage):
+    """
+    SQLite 저장소 (단일 노드/로컬 배포용).
+
+    WAL 모드로 읽기와 쓰기가 서로 막지 않으며, 사용자 선택은 주차별 인덱스가
+    걸린 행으로 저장됩니다. 동시에 들어온 선택들은 그룹 커밋으로 한 트랜잭션에
+    executemany 배치 삽입되고, 각 호출은 자신의 행이 커밋된 뒤에 반환됩니다.
+    선택 행은 (week, selection_id) 고유 키를 가지므로 전체 저장과 그룹 커밋이
+    같은 선택을 함께 쓰더라도 한 행만 남습니다.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS weekly_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            current_week TEXT NOT NULL,
+            results TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS selections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            week TEXT NOT NULL,
+            selection_id TEXT,
+            user_id TEXT NOT NULL,
+            numbers TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_selections_week ON selections (week, id);
+        CREATE INDEX IF NOT EXISTS idx_selections_user ON selections (week, user_id);
+        CREATE TABLE IF NOT EXISTS weekly_history (
+            week TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS documents (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, synchronous: str = "NORMAL"):
+        """
+        Args:
+            path: SQLite 파일 경로
+            synchronous: PRAGMA synchronous 값 (WAL에서 NORMAL은 프로세스 장애에 안전,
+                전원 장애까지 대비하려면 FULL)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate_selection_ids()
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_selections_key "
+            "ON selections (week, selection_id)"
+        )
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: list[tuple] = []
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _migrate_selection_ids(self) -> None:
+        """selection_id 열이 없던 DB에 열을 추가하고 기존 행의 ID를 채웁니다 (중복 행은 제거)."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(selections)")}
+        if "selection_id" not in columns:
+            self._conn.execute("ALTER TABLE selections ADD COLUMN selection_id TEXT")
+
+        rows = self._conn.execute(
+            "SELECT id, week, user_id, numbers FROM selections "
+            "WHERE selection_id IS NULL ORDER BY id"
+        ).fetchall()
+        seen = set()
+        updates, duplicates = [], []
+        for row_id, week, user_id, numbers in rows:
+            key = (week, selection_id(user_id, json.loads(numbers)))
+            if key in seen:
+                duplicates.append((row_id,))
+                continue
+            seen.add(key)
+            updates.append((key[1], row_id))
+        self._conn.executemany("DELETE FROM selections WHERE id = ?", duplicates)
+        self._conn.executemany("UPDATE selections SET selection_id = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _row(week: str, selection: dict) -> tuple:
+        user_id = selection.get("user_id", "")
+        numbers = selection.get("numbers", [])
+        return (
+            week,
+            selection.get("selection_id") or selection_id(user_id, numbers),
+            user_id,
+            json.dumps(numbers),
+            selection.get("strategy", ""),
+            selection.get("timestamp", ""),
+        )
+
+    def _insert_rows(self, rows: list[tuple], replace: bool = False) -> None:
+        """
+        선택 행을 삽입합니다. 이미 있는 (week, selection_id)는 건너뛰며,
+        replace면 내용이 달라진 행만 갱신합니다.
+        """
+        conflict = (
+            "DO UPDATE SET user_id = excluded.user_id, numbers = excluded.numbers, "
+            "strategy = excluded.strategy, timestamp = excluded.timestamp "
+            "WHERE numbers != excluded.numbers OR strategy != excluded.strategy "
+            "OR timestamp != excluded.timestamp"
+            if replace
+            else "DO NOTHING"
+        )
+        self._conn.executemany(
+            "INSERT INTO selections (week, selection_id, user_id, numbers, strategy, timestamp) "
+            f"VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(week, selection_id) {conflict}",
+            rows,
+        )
+
+    def load_current(self) -> Optional[dict]:
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT current_week, results FROM weekly_state WHERE id = 1"
+            ).fetchone()
+            if state is None:
+                return None
+
+            week, results = state
+            rows = self._conn.execute(
+                "SELECT selection_id, user_id, numbers, strategy, timestamp FROM selections "
+                "WHERE week = ? ORDER BY id",
+                (week,),
+            ).fetchall()
+
+        users = [
+            {
+                "user_id": user_id,
+                "selection_id": sid,
+                "numbers": json.loads(numbers),
+                "strategy": strategy,
+                "timestamp": timestamp,
+            }
+            for sid, user_id, numbers, strategy, timestamp in rows
+        ]
+        return {"users": users, "current_week": week, "results": json.loads(results)}
+
+    def load_results(self) -> Optional[dict]:
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT current_week, results FROM weekly_state WHERE id = 1"
+            ).fetchone()
+        if state is None:
+            return None
+        return {"current_week": state[0], "results": json.loads(state[1])}
+
+    def save_current(self, stats: dict) -> None:
+        week = stats.get("current_week", "")
+        users = stats.get("users", [])
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO weekly_state (id, current_week, results) VALUES (1, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET current_week = excluded.current_week, "
+                "results = excluded.results",
+                (week, json.dumps(stats.get("results", {}), ensure_ascii=False)),
+            )
+
+            # 메모리의 선택만 upsert합니다. 이 프로세스가 모르는 행은 다른 워커가
+            # 저장한 선택일 수 있으므로 지우지 않습니다 (삭제는 clear_selections만).
+            self._insert_rows([self._row(week, user) for user in users], replace=True)
+
+    def clear_selections(self, week: str) -> None:
+        with self._lock, self._conn:
+            # 대기 중인 그룹 커밋 행도 버려야 초기화된 선택이 되살아나지 않습니다
+            with self._pending_lock:
+                self._pending = [row for row in self._pending if row[0] != week]
+            self._conn.execute("DELETE FROM selections WHERE week = ?", (week,))
+
+    def append_selection(self, stats: dict, selection: dict) -> bool:
+        # 같은 (week, selection_id) 행은 고유 키로 무시됩니다. 프로세스 내 중복은
+        # WeeklyStatsManager의 선택 색인이 먼저 거르므로 항상 True를 반환합니다.
+        with self._pending_lock:
+            self._pending.append(self._row(stats.get("current_week", ""), selection))
+
+        # 그룹 커밋: 락을 얻은 스레드가 그때까지 쌓인 행을 한 번에 커밋합니다.
+        with self._lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if rows:
+                with self._conn:
+                    # 새 DB라 상태 행이 없으면 만들어 두어야 다시 로드할 때 선택이 보입니다
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO weekly_state (id, current_week) VALUES (1, ?)",
+                        (rows[-1][0],),
+                    )
+                    self._insert_rows(rows)
+        return True
+
+    def archive_week(self, week: str, summary: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weekly_history (week, data) VALUES (?, ?)",
+                (week, json.dumps(summary, ensure_ascii=False)),
+            )
+
+    def list_history(self, limit: int = 10, start_after: Optional[str] = None) -> list[dict]:
+        with self._lock:
+            if start_after is None:
+                rows = self._conn.execute(
+                    "SELECT data FROM weekly_history ORDER BY week DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT data FROM weekly_history WHERE week < ? "
+                    "ORDER BY week DESC LIMIT ?",
+                    (start_after, limit),
+                ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_archived_week(self, week: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM weekly_history WHERE week = ?", (week,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_aggregates(self) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE name = ?", (DOC_STRATEGY_AGGREGATES,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_aggregates(self, aggregates: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)",
+                (DOC_STRATEGY_AGGREGATES, json.dumps(aggregates, ensure_ascii=False)),
+            )
+
+    def iter_selections(self, week: str, page_size: int = 500) -> Iterator[list[dict]]:
+        # 키셋 페이지네이션: 페이지마다 락을 잡았다 놓으므로 쓰기를 오래 막지 않음
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, selection_id, user_id, numbers, strategy, timestamp "
+                    "FROM selections WHERE week = ? AND id > ? ORDER BY id LIMIT ?",
+                    (week, last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+
+            last_id = rows[-1][0]
+            yield [
+                {
+                    "user_id": user_id,
+                    "selection_id": sid,
+                    "numbers": json.loads(numbers),
+                    "strategy": strategy,
+                    "timestamp": timestamp,
+                }
+                for _, sid, user_id, numbers, strategy, timestamp in rows
+            ]
+
+    def import_json(self, path: str) -> bool:
+        """
+        weekly_stats.json 형식의 파일을 현재 주 상태로 가져옵니다.
+
+        Args:
+            path: JSON 파일 경로
+
+        Returns:
+            가져오기 성공 여부
+        """
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as f:
+            stats = json.load(f)
+        self.save_current(
+            {
+                "users": stats.get("users", []),
+                "current_week": stats.get("current_week", ""),
+                "results": stats.get("results", {}),
+            }
+        )
+        return True
+
+
+def create_storage(db: Any = None) -> WeeklyStatsStorage:
+    """
+    Firestore 클라이언트 유무에 따라 기본 저장소를 생성합니다.
+
+    Args:
+        db: Firestore 클라이언트 (None이면 메모리 저장소)
+
+    Returns:
+        WeeklyStatsStorage 구현체
+    """
+    if db:
+        return FirestoreStatsStorage(db)
+    return MemoryStatsStorage()
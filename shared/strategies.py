@@ -0,0 +1,356 @@
+"""
+추천 전략 레지스트리 모듈
+전략별 후보 번호 풀과 샘플링 가중치를 데이터 버전마다 한 번만 계산하여 재사용
+"""
+
+import importlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from importlib.metadata import entry_points
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .analysis import GapIndex, TransitionIndex, analyze_number_frequency, get_data_version
+
+# 외부 전략 모듈 목록 환경변수 (쉼표 구분 모듈 경로)
+STRATEGY_PLUGINS_ENV = "LOTTO_STRATEGY_PLUGINS"
+
+# 외부 전략 패키지 entry point 그룹
+STRATEGY_ENTRY_POINT_GROUP = "lotto.strategies"
+
+DEFAULT_POOL_SIZE = 20
+
+# 전이 전략 가중치 하한 (최대 점수 대비 비율, 점수 0인 후보도 뽑힐 수 있게)
+TRANSITION_WEIGHT_FLOOR = 0.05
+
+
+class AnalysisContext:
+    """전략 풀 계산에 필요한 분석 결과 묶음 (데이터 버전 단위)"""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        freq: Optional[pd.Series] = None,
+        gap_index: Optional[GapIndex] = None,
+        transition_index: Optional[TransitionIndex] = None,
+    ):
+        """
+        Args:
+            df: 로또 당첨 번호 DataFrame
+            freq: 번호별 빈도 Series (None이면 df에서 계산)
+            gap_index: 번호별 미출현 간격 인덱스 (None이면 df에서 생성)
+            transition_index: 연속 회차 전이 인덱스 (None이면 df에서 생성)
+        """
+        self.df = df
+        self.freq = freq if freq is not None else analyze_number_frequency(df)
+        self.gap_index = gap_index if gap_index is not None else GapIndex.from_history(df)
+        self.transition_index = (
+            transition_index
+            if transition_index is not None
+            else TransitionIndex.from_history(df)
+        )
+        self.version = get_data_version(df)
+
+
+class StrategyPool:
+    """전략 1개의 사전 계산된 후보 번호와 샘플링 확률 (만든 전략 버전 포함)"""
+
+    def __init__(
+        self,
+        candidates: list[int],
+        weights: Optional[list[float]] = None,
+        version: Optional[str] = None,
+    ):
+        self.candidates = np.asarray(candidates, dtype=np.int64)
+        self.version = version
+        self.probabilities = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            self.probabilities = weights / weights.sum()
+
+    def sample(self, count: int = 6) -> list[int]:
+        """후보 풀에서 중복 없이 count개를 뽑아 정렬해 반환합니다."""
+        if self.candidates.size == 0:
+            return []
+        selected = np.random.choice(
+            self.candidates,
+            size=min(count, self.candidates.size),
+            replace=False,
+            p=self.probabilities,
+        )
+        return sorted(selected.tolist())
+
+    def to_dict(self) -> dict:
+        return {
+            "candidates": self.candidates.tolist(),
+            "weights": None if self.probabilities is None else self.probabilities.tolist(),
+            "version": self.version,
+        }
+
+
+class RecommendationStrategy(ABC):
+    """
+    추천 전략 플러그인 기반 클래스.
+
+    build_pool은 히스토리가 바뀔 때만 호출되며, 추천 요청은 만들어진 풀에서
+    샘플링만 합니다. 외부 전략은 이 클래스를 상속하고 register_strategy로 등록합니다.
+    build_pool의 결과가 바뀌도록 구현을 고치면 version을 올려야 분석 스냅샷에
+    저장된 이전 풀 대신 새로 계산한 풀을 사용합니다.
+    """
+
+    name: str = ""
+    description: str = ""
+    version: str = "1"
+
+    @abstractmethod
+    def build_pool(self, context: AnalysisContext) -> StrategyPool:
+        """분석 결과로 후보 풀을 생성합니다."""
+
+
+class FrequencyStrategy(RecommendationStrategy):
+    """
+    번호별 빈도만으로 후보를 고르는 전략.
+    간격/전이 인덱스가 필요 없으므로 빈도 Series만으로 풀을 만들 수 있습니다.
+    """
+
+    @abstractmethod
+    def candidates(self, freq: pd.Series) -> list[int]:
+        """출현 빈도 내림차순 Series에서 후보 번호를 고릅니다."""
+
+    def pool_from_frequency(self, freq: Optional[pd.Series]) -> StrategyPool:
+        if freq is None or freq.empty:
+            return StrategyPool([])
+        return StrategyPool(self.candidates(freq))
+
+    def build_pool(self, context: AnalysisContext) -> StrategyPool:
+        return self.pool_from_frequency(context.freq)
+
+
+class TopFrequencyStrategy(FrequencyStrategy):
+    name = "top20"
+    description = "출현 빈도가 높은 상위 20개 번호"
+
+    def candidates(self, freq: pd.Series) -> list[int]:
+        return freq.head(DEFAULT_POOL_SIZE).index.tolist()
+
+
+class BottomFrequencyStrategy(FrequencyStrategy):
+    name = "bottom20"
+    description = "출현 빈도가 낮은 하위 20개 번호"
+
+    def candidates(self, freq: pd.Series) -> list[int]:
+        return freq.tail(DEFAULT_POOL_SIZE).index.tolist()
+
+
+class OverdueStrategy(RecommendationStrategy):
+    name = "overdue"
+    description = "가장 오래 나오지 않은 20개 번호"
+
+    def build_pool(self, context: AnalysisContext) -> StrategyPool:
+        if context.gap_index.latest_draw == 0:
+            return StrategyPool([])
+        return StrategyPool(context.gap_index.overdue_numbers(DEFAULT_POOL_SIZE))
+
+
+class TransitionStrategy(RecommendationStrategy):
+    name = "transition"
+    description = "직전 회차 번호 다음에 자주 나온 20개 번호 (조건부 빈도 가중)"
+
+    def build_pool(self, context: AnalysisContext) -> StrategyPool:
+        transitions = context.transition_index
+        if transitions.pairs == 0:
+            return StrategyPool([])
+        candidates = transitions.likely_numbers(DEFAULT_POOL_SIZE)
+        weights = transitions.next_draw_scores()[candidates]
+        if weights.max() <= 0:
+            return StrategyPool(candidates)
+        # 0이 아닌 가중치가 뽑을 개수보다 적으면 비복원 샘플링이 실패하므로 하한을 둡니다
+        weights = np.maximum(weights, weights.max() * TRANSITION_WEIGHT_FLOOR)
+        return StrategyPool(candidates, weights.tolist())
+
+
+_registry: dict[str, RecommendationStrategy] = {}
+_registry_lock = threading.Lock()
+_plugins_loaded = False
+
+
+def register_strategy(strategy: RecommendationStrategy) -> RecommendationStrategy:
+    """
+    전략을 레지스트리에 등록합니다. 같은 이름이 있으면 대체합니다.
+
+    Args:
+        strategy: 전략 인스턴스 (name 속성 필수)
+
+    Returns:
+        등록된 전략 인스턴스
+    """
+    if not strategy.name:
+        raise ValueError("전략 이름(name)이 필요합니다")
+    with _registry_lock:
+        _registry[strategy.name] = strategy
+    return strategy
+
+
+def load_strategy_plugins() -> None:
+    """
+    외부 전략을 한 번만 로드합니다.
+    LOTTO_STRATEGY_PLUGINS 환경변수의 모듈과 lotto.strategies entry point를
+    import하며, 해당 모듈은 import 시 register_strategy를 호출해야 합니다.
+    """
+    global _plugins_loaded
+
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    for module_name in filter(None, os.getenv(STRATEGY_PLUGINS_ENV, "").split(",")):
+        try:
+            importlib.import_module(module_name.strip())
+        except Exception as e:
+            print(f"전략 플러그인 로드 실패 ({module_name}): {e}")
+
+    for entry_point in entry_points(group=STRATEGY_ENTRY_POINT_GROUP):
+        try:
+            loaded = entry_point.load()
+            if isinstance(loaded, type) and issubclass(loaded, RecommendationStrategy):
+                register_strategy(loaded())
+            elif isinstance(loaded, RecommendationStrategy):
+                register_strategy(loaded)
+        except Exception as e:
+            print(f"전략 플러그인 로드 실패 ({entry_point.name}): {e}")
+
+
+def get_strategy(name: str) -> Optional[RecommendationStrategy]:
+    """이름으로 등록된 전략을 반환합니다. 없으면 None."""
+    load_strategy_plugins()
+    return _registry.get(name)
+
+
+def available_strategies() -> dict[str, str]:
+    """등록된 전략 이름 → 설명 딕셔너리를 반환합니다."""
+    load_strategy_plugins()
+    return {name: strategy.description for name, strategy in _registry.items()}
+
+
+def build_strategy_pool(strategy: RecommendationStrategy, context: AnalysisContext) -> StrategyPool:
+    """
+    전략의 후보 풀을 만들고 전략 버전을 기록합니다. 실패하면 빈 풀을 반환합니다.
+
+    Args:
+        strategy: 등록된 전략
+        context: 분석 결과
+    """
+    try:
+        pool = strategy.build_pool(context)
+    except Exception as e:
+        print(f"전략 풀 생성 실패 ({strategy.name}): {e}")
+        pool = StrategyPool([])
+    pool.version = strategy.version
+    return pool
+
+
+class StrategyPools:
+    """
+    등록된 전체 전략의 후보 풀 캐시.
+
+    refresh로 데이터 버전이 바뀔 때 모든 풀을 다시 만들고,
+    recommend는 만들어진 풀에서 샘플링만 수행합니다.
+    """
+
+    def __init__(self):
+        self.context: Optional[AnalysisContext] = None
+        self._pools: dict[str, StrategyPool] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.context.version if self.context else None
+
+    def refresh(self, context: AnalysisContext) -> None:
+        """
+        분석 결과로 모든 전략의 풀을 다시 계산합니다.
+
+        Args:
+            context: 새 데이터 버전의 분석 결과
+        """
+        load_strategy_plugins()
+        pools = {
+            name: build_strategy_pool(strategy, context)
+            for name, strategy in list(_registry.items())
+        }
+
+        with self._lock:
+            self.context = context
+            self._pools = pools
+
+    def restore(self, context: AnalysisContext, pools: dict[str, StrategyPool]) -> list[str]:
+        """
+        미리 계산된 풀(분석 스냅샷)을 다시 계산하지 않고 적용합니다.
+        등록된 전략 중 풀이 없거나 전략 버전이 다른 풀은 새로 계산합니다.
+
+        Args:
+            context: 풀과 같은 데이터 버전의 분석 결과
+            pools: 전략 이름 → 후보 풀
+
+        Returns:
+            새로 계산한 전략 이름 리스트 (비어 있으면 스냅샷 풀을 그대로 사용)
+        """
+        load_strategy_plugins()
+        restored = {}
+        rebuilt = []
+        for name, strategy in list(_registry.items()):
+            pool = pools.get(name)
+            if pool is None or pool.version != strategy.version:
+                pool = build_strategy_pool(strategy, context)
+                rebuilt.append(name)
+            restored[name] = pool
+
+        with self._lock:
+            self.context = context
+            self._pools = restored
+        return rebuilt
+
+    def pool(self, name: str) -> Optional[StrategyPool]:
+        """전략의 후보 풀을 반환합니다. 등록되지 않은 전략이면 None."""
+        pool = self._pools.get(name)
+        if pool is None and name in _registry and self.context is not None:
+            # 풀 계산 이후 등록된 전략은 처음 요청될 때 만듭니다
+            pool = build_strategy_pool(_registry[name], self.context)
+            with self._lock:
+                self._pools[name] = pool
+        return pool
+
+    def recommend(self, name: str, count: int = 6) -> list[int]:
+        """
+        사전 계산된 풀에서 추천 번호를 뽑습니다.
+
+        Args:
+            name: 전략 이름
+            count: 추천할 번호 개수
+
+        Returns:
+            정렬된 추천 번호 리스트
+
+        Raises:
+            KeyError: 등록되지 않은 전략
+        """
+        pool = self.pool(name)
+        if pool is None:
+            raise KeyError(name)
+        return pool.sample(count)
+
+    def to_dict(self) -> dict[str, dict]:
+        """전략별 후보 풀/가중치를 반환합니다."""
+        return {name: pool.to_dict() for name, pool in self._pools.items()}
+
+
+for _strategy_class in (
+    TopFrequencyStrategy,
+    BottomFrequencyStrategy,
+    OverdueStrategy,
+    TransitionStrategy,
+):
+    register_strategy(_strategy_class())
@@ -0,0 +1,205 @@
+"""
+티켓 과거 성적 조회 모듈
+번호별 출현 회차 비트셋(역색인)으로 한 티켓의 역대 전 회차 등수 분포를 계산
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .analysis import MAX_NUMBER, WIN_COLUMNS
+from .constants import PRIZE_RANKS
+
+PICK_COUNT = 6
+
+
+def _bits_from_column(column: np.ndarray) -> int:
+    """bool 배열을 위치 i가 비트 i인 정수 비트셋으로 변환합니다."""
+    if column.size == 0:
+        return 0
+    return int.from_bytes(np.packbits(column, bitorder="little").tobytes(), "little")
+
+
+def _bit_positions(bits: int) -> list[int]:
+    """비트셋에서 켜진 비트 위치를 오름차순으로 반환합니다."""
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+def validate_ticket(numbers: list[int]) -> list[int]:
+    """
+    티켓 번호를 검증합니다.
+
+    Args:
+        numbers: 사용자 번호
+
+    Returns:
+        정렬된 번호 리스트
+
+    Raises:
+        ValueError: 1~45 범위의 서로 다른 6개 번호가 아닌 경우
+    """
+    unique = sorted(set(int(number) for number in numbers))
+    if len(unique) != PICK_COUNT or len(numbers) != PICK_COUNT:
+        raise ValueError("서로 다른 6개의 번호가 필요합니다")
+    if unique[0] < 1 or unique[-1] > MAX_NUMBER:
+        raise ValueError(f"번호는 1~{MAX_NUMBER} 범위여야 합니다")
+    return unique
+
+
+class TicketHistoryIndex:
+    """
+    번호 → 출현 회차 비트셋 역색인.
+
+    비트 i는 히스토리의 i번째 회차를 뜻합니다. 티켓 6개 번호의 비트셋을
+    비트 단위 가산기(3비트 카운터 평면)로 더하면 전 회차의 일치 개수를
+    한 번에 얻고, 보너스 번호 비트셋의 OR로 2등/3등을 구분합니다.
+    """
+
+    def __init__(self):
+        self.draw_nos: list[int] = []
+        self.number_bits = [0] * (MAX_NUMBER + 1)
+        self.bonus_bits = [0] * (MAX_NUMBER + 1)
+
+    @property
+    def size(self) -> int:
+        return len(self.draw_nos)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "TicketHistoryIndex":
+        """
+        전체 히스토리로 역색인을 생성합니다.
+
+        Args:
+            df: 로또 당첨 번호 DataFrame (draw_no, num1~num6, bonus 컬럼 필요)
+
+        Returns:
+            TicketHistoryIndex
+        """
+        index = cls()
+        if df.empty:
+            return index
+
+        ordered = df.sort_values("draw_no")
+        matrix = ordered[WIN_COLUMNS].to_numpy(dtype=np.int64)
+        bonus = ordered["bonus"].to_numpy(dtype=np.int64)
+        rows = np.arange(len(ordered))
+
+        hits = np.zeros((len(ordered), MAX_NUMBER + 1), dtype=bool)
+        hits[rows[:, None], matrix] = True
+        bonus_hits = np.zeros((len(ordered), MAX_NUMBER + 1), dtype=bool)
+        bonus_hits[rows, bonus] = True
+
+        index.draw_nos = ordered["draw_no"].astype(int).tolist()
+        for number in range(1, MAX_NUMBER + 1):
+            index.number_bits[number] = _bits_from_column(hits[:, number])
+            index.bonus_bits[number] = _bits_from_column(bonus_hits[:, number])
+        return index
+
+    def update(self, draw: dict) -> bool:
+        """
+        새 회차 1건을 반영합니다.
+
+        Args:
+            draw: draw_no, num1~num6, bonus 키를 가진 추첨 결과
+
+        Returns:
+            반영 여부 (이미 반영된 회차면 False)
+        """
+        draw_no = int(draw["draw_no"])
+        if self.draw_nos and draw_no <= self.draw_nos[-1]:
+            return False
+
+        bit = 1 << len(self.draw_nos)
+        for column in WIN_COLUMNS:
+            self.number_bits[int(draw[column])] |= bit
+        self.bonus_bits[int(draw["bonus"])] |= bit
+        self.draw_nos.append(draw_no)
+        return True
+
+    def _match_planes(self, numbers: list[int]) -> tuple[int, int, int]:
+        """6개 비트셋을 더한 3비트 카운터 평면 (b0, b1, b2)"""
+        b0 = b1 = b2 = 0
+        for number in numbers:
+            bits = self.number_bits[number]
+            carry0 = b0 & bits
+            b0 ^= bits
+            carry1 = b1 & carry0
+            b1 ^= carry0
+            b2 |= carry1
+        return b0, b1, b2
+
+    def lookup(self, numbers: list[int]) -> dict:
+        """
+        티켓의 역대 전 회차 성적을 계산합니다.
+
+        Args:
+            numbers: 사용자 번호 6개
+
+        Returns:
+            일치 개수 분포, 등수 분포, 등수별 당첨 회차 딕셔너리
+
+        Raises:
+            ValueError: 번호가 유효하지 않은 경우
+        """
+        ticket = validate_ticket(numbers)
+        all_bits = (1 << self.size) - 1
+        b0, b1, b2 = self._match_planes(ticket)
+        planes = ((all_bits ^ b0, b0), (all_bits ^ b1, b1), (all_bits ^ b2, b2))
+
+        # 일치 개수 k인 회차 비트셋
+        match_bits = []
+        for k in range(PICK_COUNT + 1):
+            bits = all_bits
+            for plane, (off, on) in enumerate(planes):
+                bits &= on if k >> plane & 1 else off
+            match_bits.append(bits)
+
+        bonus = 0
+        for number in ticket:
+            bonus |= self.bonus_bits[number]
+
+        rank_bits = {
+            1: match_bits[6],
+            2: match_bits[5] & bonus,
+            3: match_bits[5] & ~bonus,
+            4: match_bits[4],
+            5: match_bits[3],
+        }
+        losing = all_bits
+        for bits in rank_bits.values():
+            losing &= ~bits
+
+        return {
+            "numbers": ticket,
+            "draws": self.size,
+            "matches": {k: bits.bit_count() for k, bits in enumerate(match_bits)},
+            "ranks": {
+                **{PRIZE_RANKS[rank]: bits.bit_count() for rank, bits in rank_bits.items()},
+                PRIZE_RANKS[0]: losing.bit_count(),
+            },
+            "winning_draws": {
+                PRIZE_RANKS[rank]: [self.draw_nos[i] for i in _bit_positions(bits)]
+                for rank, bits in rank_bits.items()
+            },
+        }
+
+
+def parse_ticket(value: Optional[str]) -> list[int]:
+    """
+    "1,2,3,4,5,6" 형식의 문자열을 번호 리스트로 변환합니다.
+
+    Raises:
+        ValueError: 형식이 잘못된 경우
+    """
+    if not value:
+        raise ValueError("numbers 파라미터가 필요합니다")
+    try:
+        return [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("번호는 쉼표로 구분된 정수여야 합니다")
@@ -3,16 +3,22 @@
 사용자 참여 현황 및 당첨 결과 추적
 """
 
-from datetime import datetime, timedelta
-from typing import TypedDict, Optional, Any
+import threading
+import uuid
+from datetime import datetime
+from typing import TypedDict, Optional, Any, Iterator
 
-from .constants import DRAW_DAY, DRAW_HOUR, DRAW_MINUTE, PRIZE_RANKS
+from .constants import PRIZE_RANKS
+from .draw_calendar import current_week_key
+from .selection_index import SelectionIndex, selection_id, ticket_key
+from .storage import WeeklyStatsStorage, create_storage
 
 
 class UserSelection(TypedDict):
     """사용자 번호 선택 타입"""
 
     user_id: str
+    selection_id: str
     numbers: list[int]
     strategy: str
     timestamp: str
@@ -25,7 +31,6 @@ class PrizeResult(TypedDict):
     winning_numbers: list[int]
     bonus_number: int
     summary: dict[str, int]
-    user_results: list[dict]
     total_users: int
 
 
@@ -39,34 +44,13 @@ class WeeklyStats(TypedDict):
 
 def get_current_week() -> str:
     """
-    현재 주차를 반환합니다 (로또 추첨일 기준: 토요일 오후 8시 45분)
+    현재 주차를 반환합니다 (로또 추첨일 기준: 토요일 오후 8시 45분, 한국 시간)
+    다음 추첨 시각 전까지는 캐시된 값을 반환합니다.
 
     Returns:
         "연도-주차번호" 형식의 문자열 (예: "2024-52")
     """
-    now = datetime.now()
-
-    # 토요일 추첨시간 설정
-    draw_time_saturday = now.replace(
-        hour=DRAW_HOUR, minute=DRAW_MINUTE, second=0, microsecond=0
-    )
-
-    # 현재 요일 (0=월요일, 6=일요일)
-    current_weekday = now.weekday()
-
-    # 이번 주 토요일 추첨시간 계산
-    days_to_saturday = (DRAW_DAY - current_weekday) % 7
-    this_saturday_draw = draw_time_saturday + timedelta(days=days_to_saturday)
-
-    # 현재 시각이 이번 주 토요일 추첨시간 이전이면 이전 주 기준
-    if now < this_saturday_draw:
-        reference_saturday = this_saturday_draw - timedelta(days=7)
-    else:
-        reference_saturday = this_saturday_draw
-
-    # 해당 토요일이 속한 주의 월요일을 기준으로 주차 계산
-    monday_of_week = reference_saturday - timedelta(days=5)
-    return f"{monday_of_week.year}-{monday_of_week.strftime('%U')}"
+    return current_week_key()
 
 
 def calculate_prize_rank(
@@ -100,89 +84,186 @@ def calculate_prize_rank(
         return 0  # 낙첨
 
 
+def _empty_strategy_counts() -> dict:
+    return {"tickets": 0, "weeks": 1, "wins": {name: 0 for name in PRIZE_RANKS.values()}}
+
+
+def _merge_strategy_counts(totals: dict[str, dict], week_counts: dict[str, dict]) -> None:
+    """주간 전략별 성적을 누적 성적에 더합니다 (totals를 직접 수정)."""
+    for name, counts in week_counts.items():
+        total = totals.setdefault(
+            name, {"tickets": 0, "weeks": 0, "wins": {rank: 0 for rank in PRIZE_RANKS.values()}}
+        )
+        total["tickets"] += counts["tickets"]
+        total["weeks"] += counts.get("weeks", 1)
+        for rank_name, count in counts["wins"].items():
+            total["wins"][rank_name] = total["wins"].get(rank_name, 0) + count
+
+
 class WeeklyStatsManager:
     """주간 통계 관리 클래스"""
 
-    def __init__(self, db: Any = None):
+    def __init__(self, db: Any = None, storage: Optional[WeeklyStatsStorage] = None):
         """
         Args:
             db: Firestore 클라이언트 (None이면 로컬 모드)
+            storage: 저장소 구현체 (None이면 db 유무에 따라 Firestore/메모리 저장소)
         """
         self.db = db
+        self.storage = storage or create_storage(db)
         self._stats: WeeklyStats = {"users": [], "current_week": "", "results": {}}
+        # 아카이브된 주차 요약은 변경되지 않으므로 프로세스 수명 동안 캐시
+        self._archived_weeks: dict[str, dict] = {}
+        # (start_after, limit) → 히스토리 페이지의 주차 목록
+        self._history_pages: dict[tuple[Optional[str], int], list[str]] = {}
+        # 현재 주 선택의 (user_id, 티켓)/티켓별 해시 색인
+        self._selection_index = SelectionIndex()
+        self._selection_lock = threading.Lock()
 
     @property
     def stats(self) -> WeeklyStats:
         return self._stats
 
     def load(self) -> None:
-        """Firebase 또는 로컬에서 주간 통계를 로드합니다."""
-        from .constants import COLLECTION_WEEKLY_STATS
-
-        if self.db:
-            try:
-                doc_ref = self.db.collection(COLLECTION_WEEKLY_STATS).document(
-                    "current"
-                )
-                doc = doc_ref.get()
-                if doc.exists:
-                    self._stats = doc.to_dict()
-                    return
-            except Exception as e:
-                print(f"Firebase에서 주간 통계 로드 실패: {e}")
+        """저장소에서 주간 통계를 로드합니다."""
+        try:
+            stats = self.storage.load_current()
+            if stats:
+                self._stats = stats
+                return
+        except Exception as e:
+            print(f"주간 통계 로드 실패: {e}")
 
         # 기본값 설정
         self._stats = {"users": [], "current_week": get_current_week(), "results": {}}
 
     def save(self) -> None:
-        """Firebase에 주간 통계를 저장합니다."""
-        from .constants import COLLECTION_WEEKLY_STATS
-
-        if self.db:
-            try:
-                doc_ref = self.db.collection(COLLECTION_WEEKLY_STATS).document(
-                    "current"
-                )
-                doc_ref.set(self._stats)
-            except Exception as e:
-                print(f"Firebase에 주간 통계 저장 실패: {e}")
+        """저장소에 주간 통계를 저장합니다."""
+        try:
+            self.storage.save_current(self._stats)
+        except Exception as e:
+            print(f"주간 통계 저장 실패: {e}")
 
     def add_user_selection(
         self, numbers: list[int], strategy: str, user_id: Optional[str] = None
     ) -> dict:
         """
         사용자 번호 선택을 저장합니다.
+        같은 사용자가 같은 티켓을 이번 주에 이미 제출했으면 저장하지 않습니다.
+
+        Args:
+            numbers: 선택한 번호
+            strategy: 사용한 전략
+            user_id: 사용자 ID (None이면 새 ID 발급)
 
         Returns:
-            저장 결과 딕셔너리
+            저장 결과 딕셔너리 (발급/사용된 user_id 포함)
         """
         self.check_and_reset_week()
+        user_id = user_id or f"user_{uuid.uuid4().hex}"
+
+        with self._selection_lock:
+            index = self._synced_selection_index()
+            if index.contains(user_id, numbers):
+                return {
+                    "success": False,
+                    "duplicate": True,
+                    "message": "이번 주에 이미 저장된 번호입니다.",
+                    "user_id": user_id,
+                    "user_count": len(self._stats["users"]),
+                }
 
-        user_data: UserSelection = {
-            "user_id": user_id or f"user_{len(self._stats['users'])}",
-            "numbers": numbers,
-            "strategy": strategy,
-            "timestamp": datetime.now().isoformat(),
-        }
+            user_data: UserSelection = {
+                "user_id": user_id,
+                "selection_id": selection_id(user_id, numbers),
+                "numbers": numbers,
+                "strategy": strategy,
+                "timestamp": datetime.now().isoformat(),
+            }
+            self._stats["users"].append(user_data)
+            index.add(user_id, numbers)
+            user_count = len(self._stats["users"])
 
-        self._stats["users"].append(user_data)
-        self.save()
+        try:
+            stored = self.storage.append_selection(self._stats, user_data)
+        except Exception as e:
+            # 저장되지 않은 선택이 메모리/색인에만 남지 않도록 되돌립니다
+            print(f"사용자 선택 저장 실패: {e}")
+            return {
+                "success": False,
+                "error": "선택을 저장하지 못했습니다. 잠시 후 다시 시도해 주세요.",
+                "user_id": user_id,
+                "user_count": self._discard_selection(user_data),
+            }
+
+        if not stored:
+            # 다른 인스턴스가 먼저 저장한 선택: 메모리에 추가한 항목을 되돌립니다
+            return {
+                "success": False,
+                "duplicate": True,
+                "message": "이번 주에 이미 저장된 번호입니다.",
+                "user_id": user_id,
+                "user_count": self._discard_selection(user_data),
+            }
 
         return {
             "success": True,
             "message": "선택이 저장되었습니다!",
-            "user_count": len(self._stats["users"]),
+            "user_id": user_id,
+            "user_count": user_count,
         }
 
+    def _discard_selection(self, user_data: UserSelection) -> int:
+        """
+        메모리 선택 목록에 추가한 항목을 되돌리고 남은 선택 수를 반환합니다.
+        목록이 줄어들면 선택 색인은 다음 동기화 때 다시 만들어집니다.
+        """
+        with self._selection_lock:
+            users = self._stats["users"]
+            for i in range(len(users) - 1, -1, -1):
+                if users[i] is user_data:
+                    del users[i]
+                    break
+            return len(users)
+
+    def _synced_selection_index(self) -> SelectionIndex:
+        """현재 주 선택 목록과 맞춘 해시 색인 (다시 로드된 경우 추가분만 색인)"""
+        self._selection_index.sync(
+            self._stats.get("current_week", ""), self._stats.get("users", [])
+        )
+        return self._selection_index
+
+    def get_ticket_popularity(self, numbers: Optional[list[int]] = None) -> dict:
+        """
+        이번 주에 같은 티켓을 선택한 횟수를 반환합니다.
+
+        Args:
+            numbers: 티켓 번호 (None이면 가장 많이 선택된 티켓 목록)
+
+        Returns:
+            티켓별 선택 수 딕셔너리
+        """
+        self.check_and_reset_week()
+        with self._selection_lock:
+            index = self._synced_selection_index()
+            result = {
+                "current_week": self._stats["current_week"],
+                "total_selections": len(index),
+            }
+            if numbers is None:
+                result["tickets"] = index.most_common()
+            else:
+                result["numbers"] = list(ticket_key(numbers))
+                result["count"] = index.popularity(numbers)
+        return result
+
     def check_and_reset_week(self) -> None:
         """새로운 주가 시작되면 통계를 초기화합니다."""
-        from .constants import COLLECTION_WEEKLY_HISTORY
-
         current_week = get_current_week()
 
         if self._stats.get("current_week") != current_week:
             # 이전 주 데이터 아카이브
-            if self.db and self._stats.get("users") and self._stats.get("results"):
+            if self._stats.get("users") and self._stats.get("results"):
                 try:
                     old_week = self._stats.get("current_week", "unknown")
                     results = self._stats.get("results", {})
@@ -208,10 +289,8 @@ class WeeklyStatsManager:
                         "archived_at": datetime.now().isoformat(),
                     }
 
-                    backup_ref = self.db.collection(COLLECTION_WEEKLY_HISTORY).document(
-                        old_week
-                    )
-                    backup_ref.set(history_summary)
+                    self.storage.archive_week(old_week, history_summary)
+                    self._archived_weeks[old_week] = history_summary
                 except Exception as e:
                     print(f"주간 히스토리 저장 실패: {e}")
 
@@ -241,44 +320,103 @@ class WeeklyStatsManager:
 
         # 등수별 카운트
         results_summary = {"1등": 0, "2등": 0, "3등": 0, "4등": 0, "5등": 0, "낙첨": 0}
-        user_results = []
+        strategy_summary: dict[str, dict] = {}
 
         for user in self._stats["users"]:
             rank = calculate_prize_rank(user["numbers"], winning_numbers, bonus_number)
             rank_name = PRIZE_RANKS.get(rank, "낙첨")
             results_summary[rank_name] += 1
 
-            user_results.append(
-                {
-                    "numbers": user["numbers"],
-                    "strategy": user["strategy"],
-                    "rank": rank,
-                    "timestamp": user.get("timestamp", ""),
-                }
-            )
+            counts = strategy_summary.get(user["strategy"])
+            if counts is None:
+                counts = strategy_summary[user["strategy"]] = _empty_strategy_counts()
+            counts["tickets"] += 1
+            counts["wins"][rank_name] += 1
 
+        # 선택별 등수는 상태 문서 크기를 선택 수에 비례하게 만들므로 저장하지 않고,
+        # 필요하면 iter_export가 페이지마다 계산합니다.
         self._stats["results"] = {
             "draw_no": int(latest_draw["draw_no"]),
             "winning_numbers": winning_numbers,
             "bonus_number": bonus_number,
             "summary": results_summary,
-            "user_results": user_results,
             "total_users": len(self._stats["users"]),
         }
 
         self.save()
+        self._update_strategy_aggregates(int(latest_draw["draw_no"]), strategy_summary)
+
+    def _update_strategy_aggregates(
+        self, draw_no: int, strategy_summary: dict[str, dict]
+    ) -> None:
+        """
+        이번 주 전략별 성적을 누적 문서에 반영합니다.
+
+        같은 주에 check_winners가 다시 실행되면 이번 주 기여분만 교체하고,
+        새 주가 되면 지난 주 기여분을 totals에 합친 뒤 교체합니다.
+        """
+        week = self._stats.get("current_week", "")
+        try:
+            aggregates = self.storage.load_aggregates() or {"totals": {}, "current": None}
+            current = aggregates.get("current")
+            if current and current.get("week") != week:
+                _merge_strategy_counts(aggregates["totals"], current["strategies"])
+
+            aggregates["current"] = {
+                "week": week,
+                "draw_no": draw_no,
+                "strategies": strategy_summary,
+            }
+            aggregates["updated_at"] = datetime.now().isoformat()
+            self.storage.save_aggregates(aggregates)
+        except Exception as e:
+            print(f"전략별 누적 성적 저장 실패: {e}")
+
+    def get_strategy_leaderboard(self) -> list[dict]:
+        """
+        전략별 누적 성적을 당첨률 내림차순으로 반환합니다 (저장소 1회 읽기).
+
+        Returns:
+            [{"strategy", "weeks", "tickets", "wins", "winners", "hit_rate"}, ...]
+        """
+        try:
+            aggregates = self.storage.load_aggregates()
+        except Exception as e:
+            print(f"전략별 누적 성적 조회 실패: {e}")
+            return []
+        if not aggregates:
+            return []
+
+        totals = {
+            name: {"tickets": counts["tickets"], "weeks": counts["weeks"], "wins": dict(counts["wins"])}
+            for name, counts in aggregates.get("totals", {}).items()
+        }
+        current = aggregates.get("current")
+        if current:
+            _merge_strategy_counts(totals, current["strategies"])
+
+        leaderboard = []
+        for name, counts in totals.items():
+            winners = counts["tickets"] - counts["wins"].get(PRIZE_RANKS[0], 0)
+            leaderboard.append(
+                {
+                    "strategy": name,
+                    "weeks": counts["weeks"],
+                    "tickets": counts["tickets"],
+                    "wins": counts["wins"],
+                    "winners": winners,
+                    "hit_rate": round(winners / counts["tickets"], 6) if counts["tickets"] else 0.0,
+                }
+            )
+        leaderboard.sort(key=lambda row: (row["hit_rate"], row["tickets"]), reverse=True)
+        return leaderboard
 
     def get_stats_summary(self) -> dict:
         """주간 통계 요약을 반환합니다."""
         self.check_and_reset_week()
 
-        unique_participants = len(
-            set(
-                user.get("user_id", "")
-                for user in self._stats["users"]
-                if user.get("user_id")
-            )
-        )
+        with self._selection_lock:
+            unique_participants = self._synced_selection_index().unique_users
 
         return {
             "current_week": self._stats["current_week"],
@@ -288,36 +426,135 @@ class WeeklyStatsManager:
             "has_results": bool(self._stats.get("results")),
         }
 
+    def iter_export(
+        self,
+        week: Optional[str] = None,
+        rank: Optional[int] = None,
+        strategy: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[list[dict]]:
+        """
+        주차의 사용자 선택과 등수를 저장소에서 페이지 단위로 읽어 반환합니다.
+        현재 주 주차/당첨 결과는 users 없이 저장소에서 읽고, 등수는 페이지마다 계산합니다.
+
+        Args:
+            week: 주차 키 (None이면 현재 주)
+            rank: 이 등수만 반환 (0=낙첨, 결과가 없으면 아무것도 반환하지 않음)
+            strategy: 이 전략의 선택만 반환
+            page_size: 저장소 페이지 크기
+
+        Returns:
+            선택 레코드 리스트(페이지)의 이터레이터. 결과 발표 전이면 rank는 None
+        """
+        current = self._load_current_results()
+        week = week or current.get("current_week") or get_current_week()
+        if week == current.get("current_week"):
+            results = current.get("results") or {}
+        else:
+            results = self._get_archived_week(week) or {}
+
+        winning_numbers = results.get("winning_numbers")
+        bonus_number = results.get("bonus_number")
+        has_results = bool(winning_numbers) and bonus_number is not None
+        if rank is not None and not has_results:
+            return
+
+        for page in self.storage.iter_selections(week, page_size):
+            records = []
+            for user in page:
+                if strategy is not None and user.get("strategy") != strategy:
+                    continue
+                user_rank = (
+                    calculate_prize_rank(user["numbers"], winning_numbers, bonus_number)
+                    if has_results
+                    else None
+                )
+                if rank is not None and user_rank != rank:
+                    continue
+                records.append(
+                    {
+                        "user_id": user.get("user_id", ""),
+                        "numbers": user["numbers"],
+                        "strategy": user.get("strategy", ""),
+                        "timestamp": user.get("timestamp", ""),
+                        "rank": user_rank,
+                    }
+                )
+            if records:
+                yield records
+
     def reset(self) -> None:
         """주간 통계를 강제 초기화합니다."""
         self._stats = {"users": [], "current_week": get_current_week(), "results": {}}
+        try:
+            self.storage.clear_selections(self._stats["current_week"])
+        except Exception as e:
+            print(f"사용자 선택 삭제 실패: {e}")
         self.save()
 
-    def get_history(self, limit: int = 10) -> list[dict]:
+    def _load_current_results(self) -> dict:
+        """저장소의 현재 주 주차/당첨 결과 (다른 인스턴스의 갱신 반영, 실패 시 메모리 상태)"""
+        try:
+            current = self.storage.load_results()
+            if current:
+                return current
+        except Exception as e:
+            print(f"주간 당첨 결과 로드 실패: {e}")
+        return {
+            "current_week": self._stats.get("current_week", ""),
+            "results": self._stats.get("results", {}),
+        }
+
+    def _get_archived_week(self, week: str) -> Optional[dict]:
+        """아카이브된 주차 요약을 캐시 우선으로 반환합니다."""
+        summary = self._archived_weeks.get(week)
+        if summary is None:
+            summary = self.storage.get_archived_week(week)
+            if summary is not None:
+                self._archived_weeks[week] = summary
+        return summary
+
+    def _latest_archived_week(self) -> Optional[str]:
+        """가장 최근 아카이브 주차 1건만 조회합니다."""
+        latest = self.storage.list_history(1)
+        if not latest:
+            return None
+        self._archived_weeks.setdefault(latest[0]["week"], latest[0])
+        return latest[0]["week"]
+
+    def get_history(self, limit: int = 10, start_after: Optional[str] = None) -> list[dict]:
         """
         저장된 주간 통계 히스토리를 가져옵니다.
-        
+
+        아카이브된 주차는 변경되지 않으므로 한 번 읽은 페이지는 캐시에서 반환합니다.
+        새 주차는 최신 페이지에만 추가되므로, 최신 페이지만 가장 최근 주차 1건을
+        조회해 새 아카이브가 생겼는지 확인합니다.
+
         Args:
             limit: 가져올 최대 개수
-            
+            start_after: 이 주차 이전부터 가져옴 (이전 페이지 마지막 항목의 week)
+
         Returns:
             히스토리 리스트 (최신순)
         """
-        if not self.db:
-            return []
-            
+        key = (start_after, limit)
         try:
-            from .constants import COLLECTION_WEEKLY_HISTORY
-            
-            collection_ref = self.db.collection(COLLECTION_WEEKLY_HISTORY)
-            docs = collection_ref.order_by('week', direction='DESCENDING').limit(limit).get()
-            
-            history = []
-            for doc in docs:
-                data = doc.to_dict()
-                history.append(data)
-                
-            return history
+            weeks = self._history_pages.get(key)
+            if weeks is not None and start_after is None:
+                if self._latest_archived_week() != (weeks[0] if weeks else None):
+                    weeks = None
+
+            if weeks is None:
+                page = self.storage.list_history(limit, start_after)
+                weeks = []
+                for summary in page:
+                    self._archived_weeks[summary["week"]] = summary
+                    weeks.append(summary["week"])
+                # 임의의 커서 문자열로 캐시가 커지지 않도록 실제 주차 커서만 저장
+                if start_after is None or start_after in self._archived_weeks:
+                    self._history_pages[key] = weeks
+
+            return [self._archived_weeks[week] for week in weeks]
         except Exception as e:
             print(f"주간 히스토리 조회 실패: {e}")
             return []
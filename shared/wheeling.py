@@ -0,0 +1,251 @@
+"""
+티켓 포트폴리오 생성(휠링) 모듈
+후보 번호 풀과 티켓 수가 주어지면 풀 안의 번호 쌍/삼중쌍을 최대한 많이
+덮도록 비트마스크 티켓을 탐욕 구성 + 지역 탐색으로 최적화
+"""
+
+import math
+import os
+import time
+from concurrent.futures import as_completed
+from itertools import combinations
+from typing import Optional
+
+import numpy as np
+
+from .analysis import MAX_NUMBER
+from .simulation import get_process_pool
+from .ticket_index import PICK_COUNT
+
+DEFAULT_TIME_BUDGET = 1.0
+
+# API 요청 한도
+MAX_BUDGET = 1000
+
+# 커버리지 단위 (2=번호 쌍, 3=삼중쌍)
+COVER_SIZES = (2, 3)
+
+# 점수가 같은 이동도 이 확률로 받아들여 평탄 구간을 벗어납니다
+PLATEAU_ACCEPT = 0.3
+
+# 이 라운드 수 동안 커버리지가 늘지 않으면 상한에 못 미쳐도 지역 탐색을 끝냅니다
+MAX_STALL_ROUNDS = 50
+
+
+def _mask(indices) -> int:
+    mask = 0
+    for index in indices:
+        mask |= 1 << int(index)
+    return mask
+
+
+def _indices(mask: int) -> list[int]:
+    return [bit for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+class _Coverage:
+    """풀 인덱스 기준 t-부분집합별 티켓 포함 횟수"""
+
+    def __init__(self, size: int, cover: int):
+        self.size = size
+        self.cover = cover
+        shape = (size,) * cover
+        self.counts = np.zeros(shape, dtype=np.int32)
+        grids = np.indices(shape)
+        # 서로 다른 원소로 이루어진 칸 (순서 있는 t-튜플)
+        self.distinct = np.ones(shape, dtype=bool)
+        for a, b in combinations(range(cover), 2):
+            self.distinct &= grids[a] != grids[b]
+        self.subsets = tuple(np.array(c) for c in zip(*combinations(range(size), cover)))
+
+    @property
+    def total(self) -> int:
+        return len(self.subsets[0])
+
+    def covered(self) -> int:
+        return int((self.counts[self.subsets] > 0).sum())
+
+    def add(self, ticket: list[int], delta: int = 1) -> None:
+        # 같은 부분집합의 모든 순열 칸을 함께 갱신 (중복 원소 칸은 읽지 않음)
+        self.counts[np.ix_(*([ticket] * self.cover))] += delta
+
+    def uncovered(self) -> np.ndarray:
+        return (self.counts == 0) & self.distinct
+
+    def gains(self, chosen: list[int], uncovered: np.ndarray) -> np.ndarray:
+        """
+        chosen에 각 번호를 추가할 때 새로 덮는 t-부분집합 수 (번호별 벡터).
+        chosen이 t-1개보다 적으면 chosen을 포함하는 미커버 부분집합 수를 잠재 점수로 씁니다.
+        """
+        if len(chosen) < self.cover - 1:
+            sub = uncovered[tuple(chosen)] if chosen else uncovered
+            axes = tuple(range(1, sub.ndim))
+            return sub.sum(axis=axes) if axes else sub.astype(np.int64)
+        score = np.zeros(self.size, dtype=np.int64)
+        for group in combinations(chosen, self.cover - 1):
+            score += uncovered[group]
+        return score
+
+
+def _build_ticket(coverage: _Coverage, rng: np.random.Generator) -> list[int]:
+    """미커버 부분집합을 가장 많이 덮도록 번호를 하나씩 고르는 탐욕 구성"""
+    uncovered = coverage.uncovered()
+    chosen: list[int] = []
+    for _ in range(PICK_COUNT):
+        score = coverage.gains(chosen, uncovered).astype(np.float64)
+        score += rng.random(coverage.size) * 0.5  # 동점은 무작위로
+        score[chosen] = -1
+        chosen.append(int(np.argmax(score)))
+    return sorted(chosen)
+
+
+def _improve_ticket(
+    coverage: _Coverage, tickets: list[list[int]], masks: set[int], i: int, rng: np.random.Generator
+) -> bool:
+    """티켓 i의 번호 1개를 교체해 커버리지가 줄지 않는 최선의 이동을 적용합니다."""
+    ticket = tickets[i]
+    coverage.add(ticket, -1)
+    uncovered = coverage.counts == 0
+    improved = False
+
+    for position in rng.permutation(PICK_COUNT):
+        removed = ticket[position]
+        rest = ticket[:position] + ticket[position + 1 :]
+        gains = np.zeros(coverage.size, dtype=np.int64)
+        for group in combinations(rest, coverage.cover - 1):
+            gains += uncovered[group]
+        current = int(gains[removed])
+        gains[rest] = -1
+        gains[removed] = -1
+        candidate = int(np.argmax(gains + rng.random(coverage.size) * 0.5))
+        best = int(gains[candidate])
+
+        if best > current or (best == current and rng.random() < PLATEAU_ACCEPT):
+            new_ticket = sorted(rest + [candidate])
+            new_mask = _mask(new_ticket)
+            if new_mask in masks:
+                continue
+            masks.discard(_mask(ticket))
+            masks.add(new_mask)
+            ticket = new_ticket
+            improved = improved or best > current
+            break
+
+    tickets[i] = ticket
+    coverage.add(ticket)
+    return improved
+
+
+def _optimize(size: int, budget: int, cover: int, seed: int, time_budget: float) -> tuple[int, list[int]]:
+    """
+    탐욕 구성 후 시간 예산 안에서 커버리지가 정체될 때까지 지역 탐색을 수행합니다 (재시작 1회 단위).
+
+    Returns:
+        (덮은 부분집합 수, 티켓 비트마스크 리스트)
+    """
+    deadline = time.perf_counter() + time_budget
+    rng = np.random.default_rng(seed)
+    coverage = _Coverage(size, cover)
+    limit = math.comb(size, PICK_COUNT)
+
+    tickets: list[list[int]] = []
+    masks: set[int] = set()
+    while len(tickets) < min(budget, limit):
+        ticket = _build_ticket(coverage, rng)
+        mask = _mask(ticket)
+        if mask in masks:
+            # 같은 티켓이 나오면 무작위 티켓으로 대체
+            ticket = sorted(rng.choice(size, PICK_COUNT, replace=False).tolist())
+            mask = _mask(ticket)
+            if mask in masks:
+                continue
+        tickets.append(ticket)
+        masks.add(mask)
+        coverage.add(ticket)
+
+    # 티켓끼리 부분집합이 겹치지 않을 때가 상한 (대개 도달할 수 없으므로 정체 라운드로도 종료)
+    upper = min(coverage.total, len(tickets) * math.comb(PICK_COUNT, cover))
+    best = coverage.covered()
+    stalled = 0
+    while (
+        tickets
+        and time.perf_counter() < deadline
+        and best < upper
+        and stalled < MAX_STALL_ROUNDS
+    ):
+        for i in rng.permutation(len(tickets))[: max(1, len(tickets) // 4)]:
+            _improve_ticket(coverage, tickets, masks, int(i), rng)
+        covered = coverage.covered()
+        if covered > best:
+            best, stalled = covered, 0
+        else:
+            stalled += 1
+
+    return coverage.covered(), [_mask(ticket) for ticket in tickets]
+
+
+def generate_portfolio(
+    pool: list[int],
+    budget: int,
+    cover: int = 2,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    restarts: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    후보 풀의 번호 쌍/삼중쌍 커버리지를 최대화하는 티켓 포트폴리오를 생성합니다.
+
+    재시작마다 다른 시드로 탐욕 구성 + 지역 탐색을 수행하며, 재시작은 프로세스 풀에서
+    병렬로 실행되고 가장 많이 덮은 결과를 반환합니다.
+
+    Args:
+        pool: 후보 번호 (1~45, 6개 이상)
+        budget: 티켓 수
+        cover: 커버리지 단위 (2=번호 쌍, 3=삼중쌍)
+        time_budget: 재시작 1회의 최대 실행 시간 (초)
+        restarts: 재시작 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        seed: 재현용 시드
+
+    Returns:
+        티켓 목록과 커버리지 딕셔너리
+
+    Raises:
+        ValueError: 풀/티켓 수/커버리지 단위가 유효하지 않은 경우
+    """
+    numbers = sorted(set(int(number) for number in pool))
+    if len(numbers) < PICK_COUNT:
+        raise ValueError(f"후보 번호가 {PICK_COUNT}개 이상 필요합니다")
+    if numbers[0] < 1 or numbers[-1] > MAX_NUMBER:
+        raise ValueError(f"번호는 1~{MAX_NUMBER} 범위여야 합니다")
+    if cover not in COVER_SIZES:
+        raise ValueError("cover는 2(번호 쌍) 또는 3(삼중쌍)이어야 합니다")
+    if budget < 1:
+        raise ValueError("티켓 수는 1 이상이어야 합니다")
+
+    restarts = max(1, restarts or os.cpu_count() or 1)
+    seeds = np.random.SeedSequence(seed).generate_state(restarts).tolist()
+    started = time.perf_counter()
+    args = (len(numbers), budget, cover)
+
+    if restarts == 1:
+        results = [_optimize(*args, seeds[0], time_budget)]
+    else:
+        executor = get_process_pool()
+        futures = [executor.submit(_optimize, *args, s, time_budget) for s in seeds]
+        results = [future.result() for future in as_completed(futures)]
+
+    covered, masks = max(results, key=lambda result: result[0])
+    total = math.comb(len(numbers), cover)
+    tickets = [[numbers[index] for index in _indices(mask)] for mask in masks]
+    return {
+        "pool": numbers,
+        "cover": cover,
+        "tickets": sorted(tickets),
+        "coverage": {
+            "covered": covered,
+            "total": total,
+            "ratio": round(covered / total, 4),
+        },
+        "restarts": restarts,
+        "elapsed": round(time.perf_counter() - started, 3),
+    }